@@ -3,11 +3,14 @@ from annotation.models.annotation import Annotation
 from annotation.models.entry import Entry
 from annotation.models.entrypage import EntryPage
 from annotation.models.evaluationinterval import EvaluationInterval
+from annotation.models.importrecord import ImportRecord
 from annotation.models.page import Page
 from annotation.models.reference import Reference
 from annotation.models.volume import Volume
 from annotation.models.dictionary import Dictionary
+from annotation.views.annotationexport import stream_annotations
 from django.contrib import admin
+from django.db.models import Exists, OuterRef
 from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 
@@ -29,7 +32,9 @@ class PageAdmin(admin.ModelAdmin):
 class EntryAdmin(admin.ModelAdmin):
     """Overrides the default admin options for Entry."""
 
-    exclude = ["title_word", "title_word_normalized", "text_length"]
+    exclude = [
+        "title_word", "title_word_normalized", "text_length", "text_hash"
+    ]
     list_display = ["title_word", "text_length"]
     search_fields = [
         "title_word__icontains", "title_word_normalized__icontains"
@@ -72,16 +77,72 @@ class EvaluationIntervalFilter(admin.SimpleListFilter):
         ])
 
 
+class DictionaryFilter(admin.SimpleListFilter):
+    """Filters the annotations by the dictionary of the entry pages."""
+
+    title = _("dictionary")
+    parameter_name = "dictionary"
+
+    def lookups(self, request, model_admin):
+        """Get the lookup values for the filter."""
+        values = Dictionary.objects.values_list('id', 'name')
+        return list(values)
+
+    def queryset(self, request, queryset):
+        """Get the queryset for the filter."""
+        if self.value() is None:
+            return queryset
+        entry_pages = EntryPage.objects.filter(
+            entry_id=OuterRef('entry_id'),
+            page__volume__dictionary_id=self.value())
+        return queryset.filter(Exists(entry_pages))
+
+
+class VolumeFilter(admin.SimpleListFilter):
+    """Filters the annotations by the volume of the entry pages."""
+
+    title = _("volume")
+    parameter_name = "volume"
+
+    def lookups(self, request, model_admin):
+        """Get the lookup values for the filter."""
+        values = Volume.objects.values_list('id', 'dictionary__name', 'name')
+        return [(volume_id, f'{dictionary} - {name}')
+                for volume_id, dictionary, name in values]
+
+    def queryset(self, request, queryset):
+        """Get the queryset for the filter."""
+        if self.value() is None:
+            return queryset
+        entry_pages = EntryPage.objects.filter(entry_id=OuterRef('entry_id'),
+                                               page__volume_id=self.value())
+        return queryset.filter(Exists(entry_pages))
+
+
 class AnnotationAdmin(admin.ModelAdmin):
     """Overrides the default admin options for Annotation."""
 
     exclude = ["title_word", "title_word_normalized", "text_length"]
     list_display = ["entry", "title_word", "text_length", "user", "status"]
-    list_filter = ["status", EvaluationIntervalFilter, "user"]
+    list_filter = [
+        "status", EvaluationIntervalFilter, DictionaryFilter, VolumeFilter,
+        "user"
+    ]
     search_fields = [
         "title_word__icontains", "title_word_normalized__icontains"
     ]
     ordering = ["entry"]
+    actions = ["export_csv", "export_jsonl"]
+
+    @admin.action(description=_("Export the selected annotations as CSV"))
+    def export_csv(self, request, queryset):
+        """Stream the selected annotations as a CSV file."""
+        return stream_annotations(queryset, 'csv')
+
+    @admin.action(description=_("Export the selected annotations as JSONL"))
+    def export_jsonl(self, request, queryset):
+        """Stream the selected annotations as a JSON Lines file."""
+        return stream_annotations(queryset, 'jsonl')
 
 
 class ReferenceAdmin(admin.ModelAdmin):
@@ -99,6 +160,14 @@ class EvaluationIntervalAdmin(admin.ModelAdmin):
     list_display = ["name", "start_date", "end_date"]
 
 
+class ImportRecordAdmin(admin.ModelAdmin):
+    """Overrides the default admin options for ImportRecord."""
+
+    list_display = ["file_path", "volume", "entry", "status"]
+    list_filter = ["status", "volume"]
+    search_fields = ["file_path__icontains"]
+
+
 class DictionaryAdmin(admin.ModelAdmin):
     """Overrides the default admin options for Dictionary."""
 
@@ -109,6 +178,7 @@ admin.site.register(Annotation, AnnotationAdmin)
 admin.site.register(Entry, EntryAdmin)
 admin.site.register(EntryPage, EntryPageAdmin)
 admin.site.register(EvaluationInterval, EvaluationIntervalAdmin)
+admin.site.register(ImportRecord, ImportRecordAdmin)
 admin.site.register(Page, PageAdmin)
 admin.site.register(Reference, ReferenceAdmin)
 admin.site.register(Volume, VolumeAdmin)
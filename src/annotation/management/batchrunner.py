@@ -0,0 +1,250 @@
+"""Runs maintenance functions over the rows of a table in resumable batches."""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Model, QuerySet
+from pathlib import Path
+from typing import Callable, Optional
+import django
+import json
+import time
+
+
+class Checkpoint:
+    """Stores the id of the last processed row of each table in a JSON file."""
+
+    def __init__(self, path: Optional[Path]):
+        """Create the checkpoint.
+
+        Parameters
+        ----------
+        path: Path, optional
+            The path of the checkpoint file; when missing, nothing is stored.
+        """
+        self.path = path
+        self.last_ids = {}
+        if path is not None and path.is_file():
+            with open(path, encoding='utf8') as f:
+                self.last_ids = json.load(f)
+
+    def load(self, key: str) -> int:
+        """Get the id of the last processed row.
+
+        Parameters
+        ----------
+        key: str, required
+            The name of the table.
+
+        Returns
+        -------
+        last_id: int
+            The id of the last processed row, or 0 if no row was processed.
+        """
+        return self.last_ids.get(key, 0)
+
+    def save(self, key: str, last_id: int):
+        """Store the id of the last processed row.
+
+        Parameters
+        ----------
+        key: str, required
+            The name of the table.
+        last_id: int, required
+            The id of the last processed row.
+        """
+        self.last_ids[key] = last_id
+        if self.path is None:
+            return
+        temp_path = self.path.with_name(f'{self.path.name}.tmp')
+        with open(temp_path, 'w', encoding='utf8') as f:
+            json.dump(self.last_ids, f)
+        temp_path.replace(self.path)
+
+    def clear(self):
+        """Remove the checkpoint file after a complete run."""
+        self.last_ids = {}
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+
+@dataclass
+class RunSummary:
+    """Contains the outcome of a run."""
+
+    num_processed: int = 0
+    num_updated: int = 0
+    last_id: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Get the number of processed rows per second."""
+        return self.num_processed / self.elapsed if self.elapsed > 0 else 0
+
+
+class BatchRunner:
+    """Applies a function to the rows of a queryset, and writes back the changes.
+
+    The rows are loaded in batches of consecutive ids, as dicts containing
+    the id and the values of `read_fields`. The function receives each row and
+    returns either `None`, when the row does not change, or a dict with the
+    new values of the fields. The function must be defined at module level,
+    to be sent to the worker processes.
+
+    The changed rows of each batch are written in a transaction, after which
+    the id of the last row in the batch is saved to the checkpoint.
+    """
+
+    def __init__(self,
+                 queryset: QuerySet,
+                 function: Callable[[dict], Optional[dict]],
+                 read_fields: list[str],
+                 write_fields: list[str],
+                 batch_size: int = 1000,
+                 workers: int = 1,
+                 checkpoint: Optional[Checkpoint] = None,
+                 write: Optional[Callable[[list[Model]], int]] = None,
+                 report: Optional[Callable[[str], None]] = None):
+        """Create the runner.
+
+        Parameters
+        ----------
+        queryset: QuerySet, required
+            The rows to process.
+        function: callable, required
+            The function which computes the changes of a row.
+        read_fields: list of str, required
+            The fields loaded for each row, besides its id.
+        write_fields: list of str, required
+            The fields which are written back.
+        batch_size: int, optional
+            The number of rows in each batch.
+        workers: int, optional
+            The number of processes which apply the function; when 1, the
+            function is applied in the current process.
+        checkpoint: Checkpoint, optional
+            The checkpoint from which to resume, and to which the progress is
+            saved.
+        write: callable, optional
+            The function which writes the changed rows, and returns the number
+            of written rows; by default, the rows are saved with `bulk_update`.
+        report: callable, optional
+            The function which writes the progress messages.
+        """
+        self.queryset = queryset.order_by('id')
+        self.model = queryset.model
+        self.function = function
+        self.read_fields = read_fields
+        self.write_fields = write_fields
+        self.batch_size = batch_size
+        self.workers = workers
+        self.checkpoint = checkpoint if checkpoint is not None else Checkpoint(
+            None)
+        self.write = write if write is not None else self.__bulk_update
+        self.report = report if report is not None else print
+
+    def run(self) -> RunSummary:
+        """Process the rows after the last checkpoint.
+
+        Returns
+        -------
+        summary: RunSummary
+            The number of processed and updated rows.
+        """
+        key = self.model._meta.label
+        last_id = self.checkpoint.load(key)
+        if last_id > 0:
+            self.report(f"Resuming {key} after id {last_id}.")
+        num_rows = self.queryset.filter(id__gt=last_id).count()
+
+        summary = RunSummary(last_id=last_id)
+        start_time = time.perf_counter()
+        executor = None
+        if self.workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.workers,
+                                           initializer=django.setup)
+        try:
+            while batch := self.__load_batch(summary.last_id):
+                records = self.__apply(batch, executor)
+                with transaction.atomic():
+                    summary.num_updated += self.write(records) if records else 0
+                summary.num_processed += len(batch)
+                summary.last_id = batch[-1]['id']
+                self.checkpoint.save(key, summary.last_id)
+
+                summary.elapsed = time.perf_counter() - start_time
+                self.report(self.__format_progress(summary, num_rows))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        summary.elapsed = time.perf_counter() - start_time
+        return summary
+
+    def __load_batch(self, last_id: int) -> list[dict]:
+        """Load the rows of the next batch.
+
+        Parameters
+        ----------
+        last_id: int, required
+            The id of the last processed row.
+
+        Returns
+        -------
+        rows: list of dict
+            The rows with ids greater than `last_id`, ordered by id.
+        """
+        rows = self.queryset.filter(id__gt=last_id)\
+                            .values('id', *self.read_fields)
+        return list(rows[:self.batch_size])
+
+    def __apply(self, batch: list[dict],
+                executor: Optional[ProcessPoolExecutor]) -> list[Model]:
+        """Apply the function to the rows of the batch.
+
+        Parameters
+        ----------
+        batch: list of dict, required
+            The rows of the batch.
+        executor: ProcessPoolExecutor, optional
+            The pool of worker processes.
+
+        Returns
+        -------
+        records: list of Model
+            The changed rows, as model instances containing the new values.
+        """
+        if executor is None:
+            results = map(self.function, batch)
+        else:
+            chunk_size = max(1, len(batch) // (self.workers * 4))
+            results = executor.map(self.function, batch, chunksize=chunk_size)
+        return [
+            self.model(id=row['id'], **changes)
+            for row, changes in zip(batch, results) if changes is not None
+        ]
+
+    def __bulk_update(self, records: list[Model]) -> int:
+        """Save the fields to be written of the specified records."""
+        return self.model.objects.bulk_update(records, self.write_fields)
+
+    def __format_progress(self, summary: RunSummary, num_rows: int) -> str:
+        """Build the progress message of the run.
+
+        Parameters
+        ----------
+        summary: RunSummary, required
+            The current state of the run.
+        num_rows: int, required
+            The number of rows to process in this run.
+
+        Returns
+        -------
+        message: str
+            The progress message, with the estimated remaining time.
+        """
+        rate = summary.rate
+        num_remaining = max(num_rows - summary.num_processed, 0)
+        eta = timedelta(seconds=round(num_remaining / rate)) if rate > 0 else '?'
+        return f"Processed {summary.num_processed} of {num_rows} rows of {self.model._meta.label}, updated {summary.num_updated} ({rate:.0f} rows per second, ETA {eta})."
@@ -0,0 +1,70 @@
+"""Defines the command for filling the text hashes of existing entries."""
+from annotation.models import Entry
+from annotation.models import compute_text_hash
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Implements the command for filling the text hashes of entries."""
+
+    help = "Compute the text hash of the entries which do not have one."
+
+    def add_arguments(self, parser):
+        """Add command-line arguments.
+
+        Parameters
+        ----------
+        parser: argparse.Parser, required
+            The arguments parser.
+        """
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=1000,
+                            help="Number of records to process in each batch")
+
+    def handle(self, *args, **options):
+        """Fill the text hashes."""
+        batch_size = options['batch_size']
+        known_hashes = set(
+            Entry.objects.exclude(text_hash=None).values_list('text_hash',
+                                                              flat=True))
+        num_updated, last_id = 0, 0
+        while batch := self.__load_batch(last_id, batch_size):
+            last_id = batch[-1].id
+            entries = []
+            for entry in batch:
+                text_hash = compute_text_hash(entry.text)
+                if text_hash in known_hashes:
+                    message = self.style.WARNING(
+                        f"Entry {entry.id} has the same text as another entry; its hash was not set."
+                    )
+                    self.stdout.write(message)
+                    continue
+                known_hashes.add(text_hash)
+                entry.text_hash = text_hash
+                entries.append(entry)
+            Entry.objects.bulk_update(entries, ['text_hash'])
+            num_updated += len(entries)
+
+        message = f"Filled the text hash of {num_updated} entries."
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def __load_batch(self, last_id: int, batch_size: int) -> list[Entry]:
+        """Load the next batch of entries without a text hash.
+
+        Parameters
+        ----------
+        last_id: int, required
+            The id of the last processed entry.
+        batch_size: int, required
+            The maximum number of entries to load.
+
+        Returns
+        -------
+        entries: list of Entry
+            The entries with ids greater than `last_id`, ordered by id.
+        """
+        entries = Entry.objects.filter(text_hash=None, id__gt=last_id)\
+                               .order_by('id')\
+                               .only('id', 'text')
+        return list(entries[:batch_size])
@@ -0,0 +1,299 @@
+"""Defines the command for loading large mapping and reference files."""
+from annotation.models import EntryPage, ImportRecord, Page, Reference, Volume
+from annotation.utils.mappings import iter_mappings, normalize_entry
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from pathlib import Path
+from typing import Iterable, Iterator
+import csv
+import io
+import itertools
+import time
+
+ROWS_PER_READ = 10_000
+
+
+class CsvStream(io.TextIOBase):
+    """Renders rows as CSV lazily, to be consumed by `COPY ... FROM STDIN`."""
+
+    def __init__(self, rows: Iterable[tuple]):
+        """Create the stream.
+
+        Parameters
+        ----------
+        rows: iterable of tuple, required
+            The rows to render.
+        """
+        self.rows = iter(rows)
+        self.pending = ''
+        self.position = 0
+        self.num_rows = 0
+
+    def readable(self) -> bool:
+        """Mark the stream as readable."""
+        return True
+
+    def read(self, size: int = -1) -> str:
+        """Read at most `size` characters from the stream.
+
+        Parameters
+        ----------
+        size: int, optional
+            The maximum number of characters to return; a negative value reads
+            the whole stream.
+
+        Returns
+        -------
+        data: str
+            The CSV data, or an empty string at the end of the stream.
+        """
+        while size < 0 or len(self.pending) - self.position < size:
+            rows = list(itertools.islice(self.rows, ROWS_PER_READ))
+            if not rows:
+                break
+            buffer = io.StringIO()
+            buffer.write(self.pending[self.position:])
+            csv.writer(buffer, lineterminator='\n').writerows(rows)
+            self.pending, self.position = buffer.getvalue(), 0
+            self.num_rows += len(rows)
+
+        end = len(self.pending) if size < 0 else self.position + size
+        data = self.pending[self.position:end]
+        self.position += len(data)
+        return data
+
+
+class Command(BaseCommand):
+    """Loads mappings and references through PostgreSQL staging tables."""
+
+    help = "Load large mapping and reference files with PostgreSQL COPY."
+    requires_migrations_checks = True
+
+    def add_arguments(self, parser):
+        """Add command-line arguments.
+
+        Parameters
+        ----------
+        parser: argparse.Parser, required
+            The command-line arguments parser.
+        """
+        parser.add_argument(
+            '--mappings-file',
+            help="The file containing mappings between entries and pages; only the entries with an import record in the volume are linked, so entries imported before import records were introduced must be imported again first.")
+        parser.add_argument(
+            '--references-file',
+            help="The file containing one reference on each line.")
+        parser.add_argument(
+            '--dictionary',
+            help='The name of the dictionary to which the volume belongs.')
+        parser.add_argument(
+            '--volume',
+            help="The name of the volume of the mapped pages.",
+            default="Vol. I")
+        parser.add_argument('--page-offset',
+                            help="The page offset.",
+                            type=int,
+                            default=0)
+
+    def handle(self, *args, **options):
+        """Load the mappings and the references."""
+        if connection.vendor != 'postgresql':
+            raise CommandError("The command requires a PostgreSQL database.")
+        if options['mappings_file'] is None and options['references_file'] is None:
+            raise CommandError(
+                "Specify at least one of --mappings-file and --references-file.")
+
+        if options['mappings_file'] is not None:
+            if options['dictionary'] is None:
+                raise CommandError("--mappings-file requires --dictionary.")
+            volume = Volume.objects.filter(
+                name=options['volume'],
+                dictionary__name=options['dictionary']).first()
+            if volume is None:
+                raise CommandError(
+                    f"Volume '{options['volume']}' of dictionary '{options['dictionary']}' does not exist.")
+            mappings_file = self.__check_file(options['mappings_file'])
+            with transaction.atomic():
+                self.__load_mappings(mappings_file, volume,
+                                     options['page_offset'])
+
+        if options['references_file'] is not None:
+            references_file = self.__check_file(options['references_file'])
+            with transaction.atomic():
+                self.__load_references(references_file)
+
+    def __load_mappings(self, mappings_file: Path, volume: Volume,
+                        offset: int):
+        """Link the imported entries of the volume to their mapped pages.
+
+        The mappings are streamed from the file, and copied together with the
+        normalized title words of the entries imported into the volume into
+        staging tables; they are joined with the pages of the volume in a single
+        statement, which also removes the duplicate pairs.
+
+        Entries and mappings whose title word normalizes to an empty string,
+        such as suffixes, are skipped: they cannot be told apart, and an empty
+        CSV field would be read by `COPY` as NULL.
+
+        Parameters
+        ----------
+        mappings_file: Path, required
+            The path of the CSV file containing the mappings.
+        volume: Volume, required
+            The volume of the pages.
+        offset: int, required
+            The page offset.
+        """
+        # The entries are fetched before copying, since the connection cannot
+        # run other queries while a COPY is in progress.
+        entries = ImportRecord.objects\
+            .filter(volume=volume,
+                    status=ImportRecord.ImportStatus.IMPORTED,
+                    entry__isnull=False)\
+            .values_list('entry_id', 'entry__title_word')
+        entry_rows = []
+        for entry_id, title_word in entries:
+            title_word = normalize_entry(title_word)
+            if title_word:
+                entry_rows.append((entry_id, title_word))
+
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                CREATE TEMPORARY TABLE staging_mappings (
+                    title_word text NOT NULL,
+                    page_no integer NOT NULL
+                ) ON COMMIT DROP""")
+            cursor.execute("""
+                CREATE TEMPORARY TABLE staging_entries (
+                    entry_id integer NOT NULL,
+                    title_word text NOT NULL
+                ) ON COMMIT DROP""")
+            self.__copy(cursor, 'staging_mappings', ['title_word', 'page_no'],
+                        iter_mappings(mappings_file))
+            self.__copy(cursor, 'staging_entries', ['entry_id', 'title_word'],
+                        entry_rows)
+            cursor.execute("ANALYZE staging_mappings")
+            cursor.execute("ANALYZE staging_entries")
+
+            start_time = time.perf_counter()
+            cursor.execute(
+                f"""
+                INSERT INTO {self.__table(EntryPage)} (entry_id, page_id)
+                SELECT DISTINCT e.entry_id, p.id
+                FROM staging_entries e
+                JOIN staging_mappings m ON m.title_word = e.title_word
+                JOIN {self.__table(Page)} p
+                    ON p.volume_id = %s AND p.page_no = m.page_no + %s
+                ON CONFLICT (entry_id, page_id) DO NOTHING""",
+                [volume.id, offset])
+            self.__report('Inserted', cursor.rowcount,
+                          self.__table(EntryPage), start_time)
+
+    def __load_references(self, references_file: Path):
+        """Insert the references which do not exist already.
+
+        Parameters
+        ----------
+        references_file: Path, required
+            The path of the file containing the references.
+        """
+        with connection.cursor() as cursor, \
+                open(references_file, encoding='utf8') as f:
+            cursor.execute("""
+                CREATE TEMPORARY TABLE staging_references (
+                    text text NOT NULL
+                ) ON COMMIT DROP""")
+            self.__copy(cursor, 'staging_references', ['text'],
+                        self.__read_lines(f))
+
+            start_time = time.perf_counter()
+            cursor.execute(f"""
+                INSERT INTO {self.__table(Reference)}
+                    (text, is_approved, row_creation_timestamp, row_update_timestamp)
+                SELECT DISTINCT text, true, now(), now()
+                FROM staging_references
+                ON CONFLICT (text) DO NOTHING""")
+            self.__report('Inserted', cursor.rowcount,
+                          self.__table(Reference), start_time)
+
+    def __copy(self, cursor, table: str, columns: list[str],
+               rows: Iterable[tuple]):
+        """Copy the rows into the specified table.
+
+        Parameters
+        ----------
+        cursor: CursorWrapper, required
+            The database cursor.
+        table: str, required
+            The name of the table.
+        columns: list of str, required
+            The names of the columns, in the order of the values in each row.
+        rows: iterable of tuple, required
+            The rows to copy.
+        """
+        start_time = time.perf_counter()
+        stream = CsvStream(rows)
+        sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        cursor.copy_expert(sql, stream)
+        self.__report('Copied', stream.num_rows, table, start_time)
+
+    def __read_lines(self, f) -> Iterator[tuple[str]]:
+        """Read the non-empty lines of the file, without surrounding whitespace.
+
+        Parameters
+        ----------
+        f: file, required
+            The file to read.
+
+        Returns
+        -------
+        rows: generator of tuple of (str)
+            The rows containing each line.
+        """
+        for line in f:
+            line = line.strip()
+            if line:
+                yield (line, )
+
+    def __report(self, action: str, num_rows: int, table: str,
+                 start_time: float):
+        """Write the number of processed rows and the throughput.
+
+        Parameters
+        ----------
+        action: str, required
+            The name of the action.
+        num_rows: int, required
+            The number of processed rows.
+        table: str, required
+            The name of the table.
+        start_time: float, required
+            The value of `time.perf_counter()` when the action started.
+        """
+        elapsed = time.perf_counter() - start_time
+        rate = num_rows / elapsed if elapsed > 0 else 0
+        message = f"{action} {num_rows} rows into {table} in {elapsed:.1f} seconds ({rate:.0f} rows per second)."
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def __check_file(self, file_name: str) -> Path:
+        """Check that the specified file exists.
+
+        Parameters
+        ----------
+        file_name: str, required
+            The name of the file.
+
+        Returns
+        -------
+        path: Path
+            The path of the file.
+        """
+        path = Path(file_name)
+        if not path.is_file():
+            raise CommandError(f"File '{path}' does not exist.")
+        return path
+
+    def __table(self, model) -> str:
+        """Get the quoted name of the table of the specified model."""
+        return connection.ops.quote_name(model._meta.db_table)
@@ -1,8 +1,76 @@
 """Defines the command for replacing diacritics with cedilla to diacritics with comma below."""
+from annotation.management.batchrunner import BatchRunner
+from annotation.management.batchrunner import Checkpoint
 from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.db.models import Max
 from annotation.models import Entry
 from annotation.models import Annotation
+from annotation.utils.xml2edtlrmd import CEDILLA_DIACRITICS
 from annotation.utils.xml2edtlrmd import correct_diacritics
+from pathlib import Path
+from typing import Optional
+import time
+
+CEDILLA_CHARS = ''.join(cedilla for cedilla, _ in CEDILLA_DIACRITICS)
+COMMA_BELOW_CHARS = ''.join(comma_below for _, comma_below in CEDILLA_DIACRITICS)
+METADATA_FIELDS = {
+    Entry: ['text_hash', 'text_length', 'title_word', 'title_word_normalized'],
+    Annotation:
+    ['text_length', 'title_word', 'title_word_normalized', 'version'],
+}
+
+
+def correct_entry(row: dict) -> Optional[dict]:
+    """Correct the diacritics in the text of an entry.
+
+    Parameters
+    ----------
+    row: dict, required
+        The id and the text of the entry.
+
+    Returns
+    -------
+    changes: dict, optional
+        The corrected text and its metadata, or `None` if the text is correct.
+    """
+    text = correct_diacritics(row['text'])
+    if text == row['text']:
+        return None
+    entry = Entry()
+    entry.set_text(text)
+    return {
+        field: getattr(entry, field)
+        for field in ['text', *METADATA_FIELDS[Entry]]
+    }
+
+
+def correct_annotation(row: dict) -> Optional[dict]:
+    """Correct the diacritics in the text of an annotation.
+
+    Parameters
+    ----------
+    row: dict, required
+        The id, the text and the version of the annotation, and the title word
+        of its entry.
+
+    Returns
+    -------
+    changes: dict, optional
+        The corrected text and its metadata, or `None` if the text is correct.
+    """
+    text = correct_diacritics(row['text'])
+    if text == row['text']:
+        return None
+    entry = Entry(title_word=row['entry__title_word'],
+                  title_word_normalized=row['entry__title_word_normalized'])
+    annotation = Annotation(entry=entry, version=row['version'])
+    annotation.set_text(text)
+    return {
+        field: getattr(annotation, field)
+        for field in ['text', *METADATA_FIELDS[Annotation]]
+    }
 
 
 class Command(BaseCommand):
@@ -22,59 +90,182 @@ class Command(BaseCommand):
                             type=int,
                             default=1000,
                             help="Number of records to process in each batch")
+        parser.add_argument(
+            '--in-database',
+            action='store_true',
+            help="Correct the texts with SQL statements run by PostgreSQL.")
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help="Number of processes used for correcting the texts.")
+        parser.add_argument(
+            '--checkpoint-file',
+            help="The file storing the last corrected id, used to resume an interrupted run.")
 
     def handle(self, *args, **kwargs):
         """Corrects the diacritics."""
         batch_size = kwargs['batch_size'] if 'batch_size' in kwargs else 1000
 
-        self.__correct_entries(batch_size)
-        self.__correct_annotations(batch_size)
+        if kwargs['in_database']:
+            if connection.vendor != 'postgresql':
+                raise CommandError(
+                    "--in-database requires a PostgreSQL database.")
+            self.__correct_in_database(Entry, 'entries', batch_size)
+            self.__correct_in_database(Annotation, 'annotations', batch_size)
+            return
 
-    def __correct_entries(self, batch_size: int):
-        """Corrects the diacritics in annotations.
+        checkpoint_file = kwargs['checkpoint_file']
+        checkpoint = Checkpoint(
+            Path(checkpoint_file) if checkpoint_file is not None else None)
+        self.__correct(Entry.objects.all(), correct_entry, ['text'], 'entries',
+                       batch_size, kwargs['workers'], checkpoint)
+        self.__correct(
+            Annotation.objects.all(), correct_annotation, [
+                'text', 'version', 'entry__title_word',
+                'entry__title_word_normalized'
+            ], 'annotations', batch_size, kwargs['workers'], checkpoint)
+        checkpoint.clear()
+
+    def __correct(self, queryset, function, read_fields: list[str], name: str,
+                  batch_size: int, workers: int, checkpoint: Checkpoint):
+        """Correct the diacritics of the records in the queryset.
 
         Parameters
         ----------
+        queryset: QuerySet, required
+            The records to correct.
+        function: callable, required
+            The function which corrects the text of a record.
+        read_fields: list of str, required
+            The fields read by the function.
+        name: str, required
+            The name of the records, used in messages.
         batch_size: int, required
             The batch size.
+        workers: int, required
+            The number of worker processes.
+        checkpoint: Checkpoint, required
+            The checkpoint of the run.
         """
-        num_updated = 0
-        num_entries = Entry.objects.count()
-        for start in range(0, num_entries, batch_size):
-            entries = Entry.objects.all()[start:start + batch_size]
-            for entry in entries:
-                corrected_text = correct_diacritics(entry.text)
-                if corrected_text != entry.text:
-                    entry.set_text(corrected_text)
-                    num_updated += 1
-                    entry.save()
-            if num_updated > 0:
-                message = f'Corrected diacritics in {num_updated} entries.'
-                self.stdout.write(self.style.SUCCESS(message))
-        self.stdout.write(
-            self.style.SUCCESS("Finished correcting diacritics in entries."))
+        runner = BatchRunner(queryset,
+                             function,
+                             read_fields,
+                             ['text', *METADATA_FIELDS[queryset.model]],
+                             batch_size=batch_size,
+                             workers=workers,
+                             checkpoint=checkpoint,
+                             write=self.__write,
+                             report=self.stdout.write)
+        summary = runner.run()
+        message = f"Finished correcting diacritics in {summary.num_updated} of {summary.num_processed} {name} in {summary.elapsed:.1f} seconds ({summary.rate:.0f} rows per second)."
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def __correct_in_database(self, model, name: str, batch_size: int):
+        """Correct the diacritics of a table with chunked `UPDATE` statements.
 
-    def __correct_annotations(self, batch_size: int):
-        """Corrects the diacritics in annotations.
+        Each chunk covers a range of ids, and its statement translates only the
+        texts containing diacritics with cedilla. The metadata is recomputed
+        only for the updated rows, in the same transaction.
 
         Parameters
         ----------
+        model: Model class, required
+            The model of the table; either `Entry` or `Annotation`.
+        name: str, required
+            The name of the records, used in messages.
         batch_size: int, required
-            The batch size.
+            The size of the range of ids in each chunk.
         """
+        table = connection.ops.quote_name(model._meta.db_table)
+        sql = f"""
+            UPDATE {table}
+            SET text = translate(text, %s, %s)
+            WHERE id > %s AND id <= %s AND text ~ %s
+            RETURNING id"""
+        num_rows = model.objects.count()
+        max_id = model.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+
+        start_time = time.perf_counter()
         num_updated = 0
-        num_annotations = Annotation.objects.count()
-        for start in range(0, num_annotations, batch_size):
-            annotations = Annotation.objects.all()[start:start + batch_size]
-            for annotation in annotations:
-                corrected_text = correct_diacritics(annotation.text)
-                if corrected_text != annotation.text:
-                    annotation.set_text(corrected_text)
-                    num_updated += 1
-                    annotation.save()
-            if num_updated > 0:
-                message = f'Corrected diacritics in {num_updated} annotations.'
+        for last_id in range(0, max_id, batch_size):
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(sql, [
+                    CEDILLA_CHARS, COMMA_BELOW_CHARS, last_id,
+                    last_id + batch_size, f'[{CEDILLA_CHARS}]'
+                ])
+                ids = [row_id for row_id, in cursor.fetchall()]
+                if ids:
+                    self.__update_metadata(model, ids)
+            if ids:
+                num_updated += len(ids)
+                message = f'Corrected diacritics in {num_updated} {name}.'
                 self.stdout.write(self.style.SUCCESS(message))
-        self.stdout.write(
-            self.style.SUCCESS(
-                "Finished correcting diacritics in annotations."))
+
+        elapsed = time.perf_counter() - start_time
+        rate = num_rows / elapsed if elapsed > 0 else 0
+        message = f"Finished correcting diacritics in {num_updated} of {num_rows} {name} in {elapsed:.1f} seconds ({rate:.0f} rows per second)."
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def __update_metadata(self, model, ids: list[int]):
+        """Recompute the metadata of the records with corrected texts.
+
+        Parameters
+        ----------
+        model: Model class, required
+            The model of the records.
+        ids: list of int, required
+            The ids of the updated records.
+        """
+        records = list(model.objects.filter(id__in=ids))
+        for record in records:
+            record.set_text(record.text)
+        if model is Entry:
+            self.__clear_duplicate_hashes(records)
+        model.objects.bulk_update(records, METADATA_FIELDS[model])
+
+    def __write(self, records: list) -> int:
+        """Save the corrected texts and their metadata.
+
+        Parameters
+        ----------
+        records: list of Entry or Annotation, required
+            The corrected records.
+
+        Returns
+        -------
+        num_updated: int
+            The number of saved records.
+        """
+        model = type(records[0])
+        if model is Entry:
+            self.__clear_duplicate_hashes(records)
+        return model.objects.bulk_update(records,
+                                         ['text', *METADATA_FIELDS[model]])
+
+    def __clear_duplicate_hashes(self, entries: list[Entry]):
+        """Clear the text hashes which would duplicate the one of another entry.
+
+        A correction can make the text of an entry identical to the text of
+        another one; since the hashes are unique, the hash of such an entry is
+        left empty, as `backfillentryhashes` does.
+
+        Parameters
+        ----------
+        entries: list of Entry, required
+            The entries with corrected texts and hashes.
+        """
+        ids = [entry.id for entry in entries]
+        known_hashes = set(
+            Entry.objects.filter(
+                text_hash__in=[entry.text_hash for entry in entries]).exclude(
+                    id__in=ids).values_list('text_hash', flat=True))
+        for entry in entries:
+            if entry.text_hash in known_hashes:
+                message = self.style.WARNING(
+                    f"Entry {entry.id} has the same text as another entry; its hash was not set."
+                )
+                self.stdout.write(message)
+                entry.text_hash = None
+            else:
+                known_hashes.add(entry.text_hash)
@@ -0,0 +1,173 @@
+"""Defines a command to export annotations to a Parquet file."""
+from annotation.models import Annotation, EntryPage
+from django.core.management.base import BaseCommand
+from pathlib import Path
+import itertools
+import pyarrow as pa
+import pyarrow.parquet as pq
+import time
+
+ANNOTATION_COLUMNS = [
+    ('annotation_id', 'id'),
+    ('entry_id', 'entry_id'),
+    ('title_word', 'title_word'),
+    ('title_word_normalized', 'title_word_normalized'),
+    ('text', 'text'),
+    ('user', 'user__username'),
+    ('status', 'status'),
+    ('version', 'version'),
+    ('row_creation_timestamp', 'row_creation_timestamp'),
+    ('row_update_timestamp', 'row_update_timestamp'),
+]
+
+
+def get_schema() -> pa.Schema:
+    """Get the schema of the exported annotations.
+
+    Returns
+    -------
+    schema: pyarrow.Schema
+        The schema of the Parquet file.
+    """
+    timestamp = pa.timestamp('us', tz='UTC')
+    return pa.schema([
+        ('annotation_id', pa.int32()),
+        ('entry_id', pa.int32()),
+        ('title_word', pa.string()),
+        ('title_word_normalized', pa.string()),
+        ('text', pa.string()),
+        ('user', pa.string()),
+        ('status', pa.string()),
+        ('version', pa.int16()),
+        ('row_creation_timestamp', timestamp),
+        ('row_update_timestamp', timestamp),
+        ('dictionary', pa.string()),
+        ('volume', pa.string()),
+        ('page_numbers', pa.list_(pa.int32())),
+    ])
+
+
+class Command(BaseCommand):
+    """Implements the command for exporting annotations to a Parquet file."""
+
+    help = "Exports annotations to a Parquet file for analysis."
+
+    def add_arguments(self, parser):
+        """Add command-line arguments.
+
+        Parameters
+        ----------
+        parser: argparse.Parser, required
+            The arguments parser.
+        """
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=10_000,
+                            help="Number of records to process in each batch")
+        parser.add_argument('--output-file',
+                            type=str,
+                            default='/tmp/edtlr/export/annotations.parquet')
+        parser.add_argument('--status',
+                            choices=Annotation.AnnotationStatus.values,
+                            help="Export only the annotations with this status.")
+
+    def handle(self, *args, **options):
+        """Export the annotations."""
+        output_file = Path(options['output_file'])
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        batch_size = options['batch_size']
+
+        annotations = Annotation.objects.order_by('id')
+        if options['status'] is not None:
+            annotations = annotations.filter(status=options['status'])
+        rows = annotations\
+            .values_list(*[field for _, field in ANNOTATION_COLUMNS])\
+            .iterator(chunk_size=batch_size)
+
+        start_time = time.perf_counter()
+        num_rows = 0
+        schema = get_schema()
+        with pq.ParquetWriter(output_file, schema,
+                              compression='zstd') as writer:
+            for batch in self.__chunk(rows, batch_size):
+                columns = self.__build_columns(batch)
+                writer.write_table(pa.table(columns, schema=schema))
+                num_rows += len(batch)
+                self.stdout.write(f"Exported {num_rows} annotations.")
+
+        elapsed = time.perf_counter() - start_time
+        rate = num_rows / elapsed if elapsed > 0 else 0
+        message = f"Finished exporting {num_rows} annotations to {output_file} in {elapsed:.1f} seconds ({rate:.1f} annotations per second)."
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def __build_columns(self, batch: list[tuple]) -> dict[str, list]:
+        """Build the columns of the row group of a batch of annotations.
+
+        Parameters
+        ----------
+        batch: list of tuple, required
+            The annotations, with the values of `ANNOTATION_COLUMNS`.
+
+        Returns
+        -------
+        columns: dict of (str, list)
+            The values of each column of the schema.
+        """
+        columns = {
+            name: list(values)
+            for (name, _), values in zip(ANNOTATION_COLUMNS, zip(*batch))
+        }
+        pages = self.__load_pages(set(columns['entry_id']))
+        empty = (None, None, [])
+        dictionaries, volumes, page_numbers = zip(
+            *[pages.get(entry_id, empty) for entry_id in columns['entry_id']])
+        columns['dictionary'] = list(dictionaries)
+        columns['volume'] = list(volumes)
+        columns['page_numbers'] = list(page_numbers)
+        return columns
+
+    def __load_pages(
+            self, entry_ids: set[int]) -> dict[int, tuple[str, str, list[int]]]:
+        """Load the dictionary, the volume and the page numbers of the entries.
+
+        Parameters
+        ----------
+        entry_ids: set of int, required
+            The ids of the entries.
+
+        Returns
+        -------
+        pages: dict of (int, (str, str, list of int))
+            The dictionary and the volume of the first page of each entry, and
+            the numbers of all its pages, indexed by entry id.
+        """
+        entry_pages = EntryPage.objects\
+            .filter(entry_id__in=entry_ids)\
+            .order_by('entry_id', 'page__page_no')\
+            .values_list('entry_id', 'page__volume__dictionary__name',
+                         'page__volume__name', 'page__page_no')
+        pages = {}
+        for entry_id, dictionary, volume, page_no in entry_pages:
+            if entry_id not in pages:
+                pages[entry_id] = (dictionary, volume, [])
+            pages[entry_id][2].append(page_no)
+        return pages
+
+    def __chunk(self, collection, batch_size: int):
+        """Split the specified collection into batches.
+
+        Parameters
+        ----------
+        collection: iterable, required
+            The collection to split.
+        batch_size: int, required
+            The number of items in each batch.
+
+        Returns
+        -------
+        batches: generator
+            The generator that returns each batch.
+        """
+        iterator = iter(collection)
+        while batch := list(itertools.islice(iterator, batch_size)):
+            yield batch
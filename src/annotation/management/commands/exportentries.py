@@ -1,14 +1,98 @@
 """Defines a command to export complete entries."""
+from annotation.utils.entryexport import ENTRY_WRITERS
+from annotation.utils.entryexport import build_entry
+from annotation.utils.entryexport import get_entry_file_name
+from annotation.utils.entryexport import serialize_entry
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from django.core.management.base import BaseCommand
-from django.db.models import Count
+from django.db.models import Count, Exists, F, OuterRef
 from annotation.models.annotation import Annotation
+from annotation.models.exportedentry import ExportedEntry
+import django
 import itertools
-import hashlib
 import os
+import time
 from pathlib import Path
+from typing import Iterator
 from xml.etree.ElementTree import ElementTree
-from xml.etree.ElementTree import Element
-from xml.etree.ElementTree import indent
+
+IN_FLIGHT_BATCHES_PER_WORKER = 2
+
+
+@dataclass
+class ExportResult:
+    """Contains the outcome of exporting a batch of entries."""
+
+    num_entries: int = 0
+    num_bytes: int = 0
+    errors: Counter = field(default_factory=Counter)
+    failed_ids: list[int] = field(default_factory=list)
+
+    def add(self, other: 'ExportResult'):
+        """Add the outcome of another batch to this one.
+
+        Parameters
+        ----------
+        other: ExportResult, required
+            The outcome to add.
+        """
+        self.num_entries += other.num_entries
+        self.num_bytes += other.num_bytes
+        self.errors.update(other.errors)
+        self.failed_ids.extend(other.failed_ids)
+
+
+def export_entries(output_dir: str,
+                   data: list[tuple[int, str, str, str]]) -> ExportResult:
+    """Export the entries into the output directory.
+
+    The function runs in the worker processes of the export, so it should not
+    access the database.
+
+    Parameters
+    ----------
+    output_dir: str, required
+        The path of the output directory.
+    data: list of (int, str, str, str) tuples, required
+        The id, title word, normalized title word and text of each entry.
+
+    Returns
+    -------
+    result: ExportResult
+        The number of entries and bytes written, and the errors.
+    """
+    result = ExportResult()
+    for entry_id, title_word, title_word_normalized, text in data:
+        entry = build_entry(entry_id, title_word, title_word_normalized, text)
+        file_path = Path(output_dir) / get_entry_file_name(
+            title_word_normalized, entry_id)
+        try:
+            result.num_bytes += write_entry(entry, file_path)
+            result.num_entries += 1
+        except (OSError, AttributeError) as ex:
+            result.errors[type(ex).__name__] += 1
+            result.failed_ids.append(entry_id)
+    return result
+
+
+def write_entry(entry: ElementTree, file_path: Path) -> int:
+    """Write the provided entry to the specified file.
+
+    Parameters
+    ----------
+    entry: ElementTree, required
+        The entry to write.
+    file_path: Path, required
+        The path of the file where to save the entry.
+
+    Returns
+    -------
+    num_bytes: int
+        The size of the file.
+    """
+    return file_path.write_bytes(serialize_entry(entry))
 
 
 class Command(BaseCommand):
@@ -31,6 +115,24 @@ class Command(BaseCommand):
         parser.add_argument('--output-dir',
                             type=str,
                             default='/tmp/edtlr/export/entries/')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help="Number of processes used for building and writing entry files.")
+        parser.add_argument(
+            '--format',
+            choices=['files', *ENTRY_WRITERS.keys()],
+            default='files',
+            help="Write one file per entry, or a single archive or file with all entries.")
+        parser.add_argument(
+            '--output-file',
+            type=str,
+            help="The path of the single output file; defaults to 'entries.<format>' in the output directory.")
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help="Export only the entries which changed since the last incremental export to the same output, and remove the ones which are no longer complete.")
 
     def handle(self, *args, **options):
         """Export complete entries."""
@@ -41,109 +143,273 @@ class Command(BaseCommand):
             self.stdout.write(message)
             os.makedirs(output_dir)
 
-        entry_ids = self.__load_complete_entries()
-        for batch in self.__chunk(entry_ids, batch_size):
-            data = self.__load_data(batch)
-            self.__export_entries(output_dir, data)
+        output_file = self.__get_output_file(options)
+        # The export log is only read and updated by incremental exports.
+        target = None
+        if options['incremental']:
+            target = self.__get_target(options['format'], output_dir,
+                                       output_file)
+
+        start_time = time.perf_counter()
+        entries = self.__load_complete_entries(batch_size, target)
+        # The batches are exported without the annotation ids and versions,
+        # and kept until their results arrive, in the same order.
+        pending_batches = deque()
+
+        def get_batches():
+            for batch in self.__chunk(entries, batch_size):
+                pending_batches.append(batch)
+                yield [row[:4] for row in batch]
+
+        if output_file is None:
+            batch_results = self.__export_batches(output_dir, get_batches(),
+                                                  options['workers'])
+        else:
+            batch_results = self.__export_to_single_file(
+                output_file, ENTRY_WRITERS[options['format']], get_batches())
+
+        result = ExportResult()
+        for batch_result in batch_results:
+            batch = pending_batches.popleft()
+            if target is not None:
+                self.__record_exported_entries(batch, batch_result.failed_ids,
+                                               target, output_dir,
+                                               output_file is None)
+            result.add(batch_result)
+            self.stdout.write(f"Exported {result.num_entries} entries.")
+        num_deleted = 0
+        if target is not None:
+            num_deleted = self.__export_deletions(target, output_dir,
+                                                  output_file)
 
-    def __export_entries(self, output_dir: str, data: dict[int, tuple]):
-        """Export the entries into the output directory.
+        self.__write_summary(result, num_deleted,
+                             time.perf_counter() - start_time)
+
+    def __get_output_file(self, options: dict) -> Path | None:
+        """Get the path of the single output file of the export.
 
         Parameters
         ----------
+        options: dict, required
+            The command-line options.
+
+        Returns
+        -------
+        output_file: Path
+            The path of the output file, or None if each entry is exported to
+            its own file.
+        """
+        if options['format'] == 'files':
+            return None
+        output_file = options['output_file']
+        if output_file is None:
+            output_file = Path(
+                options['output_dir']) / f"entries.{options['format']}"
+        return Path(output_file)
+
+    def __write_summary(self, result: ExportResult, num_deleted: int,
+                        elapsed: float):
+        """Write the number of exported entries, the throughput and the errors.
+
+        Parameters
+        ----------
+        result: ExportResult, required
+            The outcome of the export.
+        num_deleted: int, required
+            The number of deleted entries.
+        elapsed: float, required
+            The duration of the export, in seconds.
+        """
+        entry_rate = result.num_entries / elapsed if elapsed > 0 else 0
+        byte_rate = result.num_bytes / elapsed / (1024 * 1024) if elapsed > 0 else 0
+        message = f"Finished exporting {result.num_entries} entries ({result.num_bytes / (1024 * 1024):.1f} MB) in {elapsed:.1f} seconds ({entry_rate:.1f} entries per second, {byte_rate:.1f} MB per second)."
+        self.stdout.write(self.style.SUCCESS(message))
+        if num_deleted > 0:
+            message = f"{num_deleted} entries are no longer complete and were deleted."
+            self.stdout.write(self.style.WARNING(message))
+        for error, count in result.errors.most_common():
+            message = f"{count} entries could not be saved because of {error}."
+            self.stderr.write(message, self.style.ERROR)
+
+    def __get_target(self, export_format: str, output_dir: str,
+                     output_file: Path | None) -> str:
+        """Get the name of the target under which the exported entries are logged.
+
+        Parameters
+        ----------
+        export_format: str, required
+            The format of the export.
         output_dir: str, required
             The path of the output directory.
-        data: dict of (int, (str, str, str)), required
-            The entries to export.
+        output_file: Path, optional
+            The path of the single output file, if any.
+
+        Returns
+        -------
+        target: str
+            The format, followed by the absolute path of the output file or
+            directory.
         """
-        for entry_id, val in data.items():
-            title_word, title_word_normalized, text = val
-            entry = self.__build_entry(entry_id, title_word,
-                                       title_word_normalized, text)
-            file_path = self.__get_entry_file_path(output_dir,
-                                                   title_word_normalized,
-                                                   entry_id)
-            self.__write_entry(entry, file_path)
-
-    def __write_entry(self, entry: ElementTree, file_path: Path):
-        """Write the provided entry to the specified file.
+        path = Path(output_dir) if output_file is None else output_file
+        return f'{export_format}:{path.resolve()}'
+
+    def __record_exported_entries(self, batch: list[tuple], failed_ids: list[int],
+                                  target: str, output_dir: str,
+                                  remove_renamed: bool):
+        """Record the annotations exported for the entries of the batch.
 
         Parameters
         ----------
-        entry: ElementTree, required
-            The entry to write.
-        file_path: Path, required
-            The path of the file where to save the entry.
+        batch: list of tuple, required
+            The rows of the exported entries, as returned by
+            `__load_complete_entries`.
+        failed_ids: list of int, required
+            The ids of the entries which could not be exported.
+        target: str, required
+            The target of the export.
+        output_dir: str, required
+            The path of the output directory.
+        remove_renamed: bool, required
+            Whether to remove the files which were exported under a different
+            name the last time.
         """
-        try:
-            indent(entry.getroot())
-            entry.write(file_path, xml_declaration=True, encoding='UTF-8')
-        except (FileNotFoundError, AttributeError) as ex:
-            style = self.style.ERROR
-            self.stderr.write(f'Error saving entry to file {file_path}. {ex}',
-                              style)
+        failed_ids = set(failed_ids)
+        exported = {
+            entry_id: ExportedEntry(
+                target=target,
+                entry_id=entry_id,
+                annotation_id=annotation_id,
+                version=version,
+                file_name=get_entry_file_name(title_word_normalized, entry_id))
+            for entry_id, _, title_word_normalized, _, annotation_id, version
+            in batch if entry_id not in failed_ids
+        }
+        if remove_renamed:
+            previous = ExportedEntry.objects\
+                .filter(target=target, entry_id__in=exported.keys())\
+                .values_list('entry_id', 'file_name')
+            for entry_id, file_name in previous:
+                if file_name != exported[entry_id].file_name:
+                    (Path(output_dir) / file_name).unlink(missing_ok=True)
 
-    def __get_entry_file_path(self, output_dir: str, title_word: str,
-                              entry_id: int) -> Path:
-        """Build the file path of the entry from the specified parameters.
+        ExportedEntry.objects.bulk_create(
+            exported.values(),
+            update_conflicts=True,
+            unique_fields=['target', 'entry'],
+            update_fields=[
+                'annotation', 'version', 'file_name', 'row_update_timestamp'
+            ])
+
+    def __export_deletions(self, target: str, output_dir: str,
+                           output_file: Path | None) -> int:
+        """Export the deletion of the entries which are no longer complete.
+
+        The files of the entries are removed from the output directory. When
+        the entries are exported into a single file, their names are listed
+        instead in a file with the `.deleted` suffix next to it.
 
         Parameters
         ----------
+        target: str, required
+            The target of the export.
         output_dir: str, required
             The path of the output directory.
-        title_word: str, required
-            The title word of the entry.
-        entry_id: int, required
-            The id of the entry.
+        output_file: Path, optional
+            The path of the single output file, if any.
+
+        Returns
+        -------
+        num_deleted: int
+            The number of deleted entries.
+        """
+        deleted = ExportedEntry.objects\
+            .filter(target=target)\
+            .exclude(entry_id__in=self.__get_complete_entries())\
+            .values_list('id', 'file_name')
+        deleted = list(deleted)
+        if output_file is None:
+            for _, file_name in deleted:
+                (Path(output_dir) / file_name).unlink(missing_ok=True)
+        else:
+            deletions_file = output_file.with_name(f'{output_file.name}.deleted')
+            with open(deletions_file, 'w', encoding='utf8') as f:
+                f.writelines(f'{file_name}\n' for _, file_name in deleted)
+
+        ExportedEntry.objects.filter(
+            id__in=[record_id for record_id, _ in deleted]).delete()
+        return len(deleted)
+
+    def __export_to_single_file(
+            self, output_file: Path, writer_class: type,
+            batches: Iterator[list[tuple[int, str, str, str]]]
+    ) -> Iterator[ExportResult]:
+        """Export the batches of entries into a single output file.
+
+        The entries are serialized and written one at a time, in this process.
+
+        Parameters
+        ----------
+        output_file: Path, required
+            The path of the output file.
+        writer_class: type, required
+            The subclass of EntryWriter which writes the output file.
+        batches: iterator of list of (int, str, str, str) tuples, required
+            The batches of entries to export.
 
         Returns
         -------
-        file_path: Path
-            The path of the entry file.
+        results: generator of ExportResult
+            The outcome of each batch.
         """
-        return Path(output_dir) / Path(f'{title_word}-{entry_id}.xml')
+        with writer_class(output_file) as writer:
+            for batch in batches:
+                result = ExportResult()
+                for row in batch:
+                    result.num_bytes += writer.write(*row)
+                    result.num_entries += 1
+                yield result
+        message = f'Wrote the manifest of {output_file} to {writer.manifest_path}.'
+        self.stdout.write(self.style.NOTICE(message))
+
+    def __export_batches(self, output_dir: str,
+                         batches: Iterator[list[tuple[int, str, str, str]]],
+                         workers: int) -> Iterator[ExportResult]:
+        """Export the batches of entries, using a pool of processes.
 
-    def __build_entry(self, entry_id: int, title_word: str,
-                      title_word_normalized: str, text: str) -> ElementTree:
-        """Build the element tree that represents the entry.
+        At most `IN_FLIGHT_BATCHES_PER_WORKER` batches per worker are submitted
+        to the pool before their results are consumed, so that the database
+        cursor is not read ahead of the writers.
 
         Parameters
         ----------
-        entry_id: int, required
-            The id of the entry.
-        title_word: str, required
-            The title word.
-        title_word_normalized: str, required
-            The normalized form of the title word.
-        text: str, required
-            The text of the entry.
+        output_dir: str, required
+            The path of the output directory.
+        batches: iterator of list of (int, str, str, str) tuples, required
+            The batches of entries to export.
+        workers: int, required
+            The number of worker processes.
 
         Returns
         -------
-        entry: ElementTree
-            The element tree that represents the entry.
+        results: generator of ExportResult
+            The outcome of each batch, in the order of the batches.
         """
-        entry_elem = Element("entry", id=str(entry_id))
-        entry_elem.set('xmlns:edtlr', 'https://edtlr.iit.academiaromana-is.ro')
-
-        tw_elem = Element("titleWord",
-                          md5hash=self.__compute_md5_hash(title_word))
-        tw_elem.text = title_word
-        entry_elem.append(tw_elem)
-
-        twn_elem = Element(
-            'titleWordNormalized',
-            md5hash=self.__compute_md5_hash(title_word_normalized))
-        twn_elem.text = title_word_normalized
-        entry_elem.append(twn_elem)
-        body_elem = Element("body", md5hash=self.__compute_md5_hash(text))
-        for line in text.splitlines():
-            paragraph_elem = Element("paragraph")
-            paragraph_elem.text = line
-            body_elem.append(paragraph_elem)
-        entry_elem.append(body_elem)
-
-        return ElementTree(entry_elem)
+        if workers <= 1:
+            for batch in batches:
+                yield export_entries(output_dir, batch)
+            return
+
+        window_size = workers * IN_FLIGHT_BATCHES_PER_WORKER
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=django.setup) as executor:
+            in_flight = deque()
+            for batch in batches:
+                in_flight.append(
+                    executor.submit(export_entries, output_dir, batch))
+                if len(in_flight) >= window_size:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
 
     def __chunk(self, collection, batch_size: int):
         """Split the specified collection into batches.
@@ -164,52 +430,60 @@ class Command(BaseCommand):
         while batch := list(itertools.islice(iterator, batch_size)):
             yield batch
 
-    def __load_data(self,
-                    entry_ids: list[int]) -> dict[int, tuple[str, str, str]]:
-        """Load the data of the specified entries.
+    def __load_complete_entries(
+            self, chunk_size: int,
+            target: str | None) -> Iterator[tuple[int, str, str, str, int, int]]:
+        """Load the entries which have all annotations complete.
+
+        The rows are streamed from a server-side cursor, and exactly one
+        complete annotation is selected for each entry: the one updated last.
 
         Parameters
         ----------
-        entry_ids: list of int, required
-            The ids of the entries for which to load data.
+        chunk_size: int, required
+            The number of rows fetched from the cursor at a time.
+        target: str, optional
+            The target of an incremental export; if specified, the entries
+            whose selected annotation was already exported to it in the same
+            version are skipped.
 
         Returns
         -------
-        data: dictionary of (entry_id, entry_data)
-            The data of the entries.
+        entries: iterator of (int, str, str, str, int, int) tuples
+            The id, title word, normalized title word and text of each entry,
+            followed by the id and the version of the selected annotation.
         """
-        data = Annotation.objects\
-            .filter(entry_id__in=entry_ids)\
-            .values_list('entry_id', 'text', 'title_word', 'title_word_normalized')
-        return {entry_id: (tw, twn, text) for entry_id, text, tw, twn in data}
+        annotations = Annotation.objects\
+            .filter(status='Complete',
+                    entry_id__in=self.__get_complete_entries())\
+            .order_by('entry_id',
+                      F('row_update_timestamp').desc(nulls_last=True), '-id')\
+            .distinct('entry_id')
+        if target is not None:
+            exported = ExportedEntry.objects.filter(
+                target=target,
+                entry_id=OuterRef('entry_id'),
+                annotation_id=OuterRef('id'),
+                version=OuterRef('version'))
+            annotations = Annotation.objects\
+                .filter(id__in=annotations.values('id'))\
+                .exclude(Exists(exported))\
+                .order_by('entry_id')
+        return annotations\
+            .values_list('entry_id', 'title_word', 'title_word_normalized',
+                         'text', 'id', 'version')\
+            .iterator(chunk_size=chunk_size)
 
-    def __load_complete_entries(self) -> list[int]:
-        """Load the ids of the entries which have all annotations complete.
-
-        Returns
-        -------
-        entry_ids: list of int
-            The list of ids of the complete entries.
-        """
-        complete_entries = Annotation.objects.filter(status='Complete') \
-                                             .values('entry_id') \
-                                             .annotate(entry_count=Count('entry_id')) \
-                                             .filter(entry_count__gt=1) \
-                                             .values_list('entry_id', flat=True)
-        return list(complete_entries)
-
-    def __compute_md5_hash(self, value: str) -> str:
-        """Compute the MD5 hash of the provided value.
-
-        Parameters
-        ----------
-        value: str, required
-            The value for which to compute the hash.
+    def __get_complete_entries(self):
+        """Get the query of the ids of the entries with all annotations complete.
 
         Returns
         -------
-        hash_str: str
-            The hash string.
+        entry_ids: QuerySet
+            The query which selects the ids of the complete entries.
         """
-        algorithm = hashlib.md5
-        return algorithm(value.encode('utf-8')).hexdigest()
+        return Annotation.objects.filter(status='Complete') \
+                                 .values('entry_id') \
+                                 .annotate(entry_count=Count('entry_id')) \
+                                 .filter(entry_count__gt=1) \
+                                 .values('entry_id')
@@ -1,15 +1,79 @@
 """Defines the command for importing data into the database."""
 from annotation.models import Dictionary, Volume, Page, Entry, EntryPage
+from annotation.models import ImportRecord
+from annotation.models import compute_text_hash
+from annotation.utils.images import ImageInfo, read_image_info
+from annotation.utils.mappings import load_mappings, normalize_entry
 from annotation.utils.xml2edtlrmd import convert_xml_to_edtlr_markdown
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from django.core.management.base import BaseCommand
-from itertools import takewhile
+from django.db import transaction
 from pathlib import Path
-from typing import List, Dict
-import pandas as pd
+from typing import Iterable, Iterator, List, Dict
+import django
+import hashlib
+import itertools
+import os
 import re
+import time
 
-REPLACEMENT_MAP = str.maketrans("ŞşŢţÅåÁáẤấẮắ", "ȘșȚțAaAaAaAa")
 TITLE_WORD_REGEX = r"^\*\*(?P<title_word>[^*]+)\*\*"
+IN_FLIGHT_FILES_PER_WORKER = 8
+MAX_REPORTED_ITEMS = 50
+
+
+def read_contents(
+        entry_file: Path,
+        imported_hash: str | None = None
+) -> tuple[str, tuple[str, str] | None]:
+    """Read the contents of the entry file.
+
+    The function runs in the worker processes of the import, so it should not
+    access the database.
+
+    Parameters
+    ----------
+    entry_file: Path, required
+        The path of the entry file.
+    imported_hash: str, optional
+        The hash of the file contents when the file was last imported. If the
+        contents are unchanged the file is not converted.
+
+    Returns
+    -------
+    (content_hash, contents): tuple of (str, (str, str) or None)
+        The hash of the file contents, and the title word and text of the entry,
+        or None if the file is unchanged or the title word could not be extracted.
+    """
+    with open(entry_file, 'rb') as f:
+        data = f.read()
+    content_hash = hashlib.md5(data, usedforsecurity=False).hexdigest()
+    if content_hash == imported_hash:
+        return (content_hash, None)
+
+    # Normalize the line endings, so that files saved with CRLF produce the
+    # same text, and the same text hash, as their LF counterparts.
+    text = data.decode('utf8').replace('\r\n', '\n').replace('\r', '\n')
+    text = convert_xml_to_edtlr_markdown(text)
+    match = re.match(TITLE_WORD_REGEX, text, re.MULTILINE | re.UNICODE)
+    if match is None:
+        return (content_hash, None)
+    return (content_hash, (match.group(1), text))
+
+
+@dataclass
+class ParsedEntry:
+    """Contains the outcome of parsing an entry file."""
+
+    entry_file: Path
+    content_hash: str
+    status: str | None
+    text: str | None = None
+    pages: List[Page] = field(default_factory=list)
+    title_word: str | None = None
+    missing_pages: List[int] = field(default_factory=list)
 
 
 class Command(BaseCommand):
@@ -18,12 +82,6 @@ class Command(BaseCommand):
     help = "Import the data into the database."
     requires_migrations_checks = True
 
-    class EntryParsingStrategy:
-        """Defines the names of entry parsing strategies."""
-
-        TAKE_FIRST_WORD = 'TakeFirstWord'
-        LEAVE_UNCHANGED = 'LeaveUnchanged'
-
     def add_arguments(self, parser):
         """Add command-line arguments.
 
@@ -60,14 +118,29 @@ class Command(BaseCommand):
                             help="The page offset.",
                             type=int,
                             default=0)
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=1000,
+                            help="Number of records to process in each batch")
         parser.add_argument(
-            '--parse-strategy',
-            help="The strategy used for parsing the entry.",
-            choices=[
-                Command.EntryParsingStrategy.TAKE_FIRST_WORD,
-                Command.EntryParsingStrategy.LEAVE_UNCHANGED
-            ],
-            default=Command.EntryParsingStrategy.TAKE_FIRST_WORD)
+            '--workers',
+            type=int,
+            default=1,
+            help="Number of processes used for reading and converting entry files.")
+        parser.add_argument(
+            '--reimport',
+            action='store_true',
+            help="Import the entry files even if they are unchanged since the last import.")
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Parse the data and report the problems found, without writing to the database.")
+
+        parser.add_argument(
+            '--scan-threads',
+            type=int,
+            default=8,
+            help="Number of threads used for reading the page images.")
 
     def handle(self, *args, **options):
         """Import the data into the database."""
@@ -75,190 +148,489 @@ class Command(BaseCommand):
         images_dir = Path(options['images_directory'])
         mappings_file = Path(options['mappings_file'])
         static_dir = Path(options['static_directory'])
-        parse_strategy = options['parse_strategy']
+        batch_size = options['batch_size']
+        offset = 0
+        if options['page_offset'] is not None:
+            offset = int(options['page_offset'])
+
+        self.__check_text_hashes()
+        if options['dry_run']:
+            self.__analyze(options, offset)
+            return
 
-        images = self.__scan_images(images_dir)
+        images = self.__scan_images(images_dir, options['scan_threads'])
         dictionary = self.__load_dictionary(options['dictionary'])
         volume = self.__load_volume(options['volume'], dictionary)
-        mappings = self.__load_mappings(mappings_file, parse_strategy)
-        pages = self.__create_pages(images, volume, static_dir)
+        mappings = load_mappings(mappings_file)
+        pages = self.__create_pages(images, volume, static_dir, batch_size)
+        manifest = {} if options['reimport'] else self.__load_manifest(volume)
+
+        start_time = time.perf_counter()
+        parsed_entries = self.__parse_entries(entries_dir, mappings, pages,
+                                              offset, manifest,
+                                              options['workers'])
+        stats = Counter()
+        for batch in self.__chunk(parsed_entries, batch_size):
+            with transaction.atomic():
+                self.__import_batch(batch, volume)
+            stats.update(pe.status for pe in batch)
+            num_imported = stats[ImportRecord.ImportStatus.IMPORTED]
+            self.stdout.write(f"Imported {num_imported} entries.")
+
+        elapsed = time.perf_counter() - start_time
+        num_imported = stats[ImportRecord.ImportStatus.IMPORTED]
+        num_skipped = stats[None]
+        num_failed = stats.total() - num_imported - num_skipped
+        rate = num_imported / elapsed if elapsed > 0 else 0
+        message = f"Finished importing {num_imported} entries in {elapsed:.1f} seconds ({rate:.1f} entries per second); {num_skipped} unchanged files were skipped and {num_failed} files failed."
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def __analyze(self, options: dict, offset: int):
+        """Parse the data as an import would, and report what was found.
+
+        Nothing is written to the database: the dictionary, the volume and the
+        pages are only looked up, and the entries are checked against the
+        hashes of the existing entries.
 
-        for entry_file in entries_dir.glob("*.xml"):
-            contents = self.__read_contents(entry_file)
-            if contents is None:
-                error = f'Could not extract title word from file {entry_file}.'
-                self.stderr.write(error)
+        Parameters
+        ----------
+        options: dict, required
+            The command-line options.
+        offset: int, required
+            The page offset.
+        """
+        timings = {}
+        start_time = time.perf_counter()
+        images = self.__scan_images(Path(options['images_directory']),
+                                    options['scan_threads'])
+        timings['Scanning images'] = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        mappings = load_mappings(Path(options['mappings_file']))
+        timings['Loading mappings'] = time.perf_counter() - start_time
+
+        volume = Volume.objects.filter(
+            name=options['volume'],
+            dictionary__name=options['dictionary']).first()
+        manifest = {}
+        if volume is not None and not options['reimport']:
+            manifest = self.__load_manifest(volume)
+        pages = self.__build_pages(images, volume,
+                                   Path(options['static_directory']))
+        pages = {page.page_no: page for page in pages}
+
+        stats = Counter()
+        problems = {
+            'Files without a title word': [],
+            'Entries without page mappings': [],
+            'Entries with missing page images': [],
+            'Entries duplicated within the files': [],
+            'Entries which already exist': [],
+        }
+        files_by_hash = {}
+        check_time = 0.0
+        start_time = time.perf_counter()
+        parsed_entries = self.__parse_entries(
+            Path(options['entries_directory']), mappings, pages, offset,
+            manifest, options['workers'])
+        for batch in self.__chunk(parsed_entries, options['batch_size']):
+            stats.update(pe.status for pe in batch)
+            self.__classify_problems(batch, problems)
+
+            check_start_time = time.perf_counter()
+            self.__find_duplicates(batch, files_by_hash, problems)
+            check_time += time.perf_counter() - check_start_time
+        timings['Parsing entries'] = time.perf_counter() - start_time - check_time
+        timings['Checking duplicates'] = check_time
+
+        self.__write_report(stats, problems, timings)
+
+    def __classify_problems(self, batch: List[ParsedEntry],
+                            problems: Dict[str, List[str]]):
+        """Add the problems found while parsing the batch to the report.
+
+        Parameters
+        ----------
+        batch: list of ParsedEntry, required
+            The parsed entries.
+        problems: dict of (str, list of str), required
+            The descriptions of the problems found, indexed by category.
+        """
+        for pe in batch:
+            if pe.status == ImportRecord.ImportStatus.INVALID:
+                problems['Files without a title word'].append(
+                    str(pe.entry_file))
+            elif pe.status == ImportRecord.ImportStatus.UNMAPPED:
+                problems['Entries without page mappings'].append(
+                    f'{pe.title_word} ({pe.entry_file.name})')
+            elif pe.missing_pages:
+                missing = ', '.join(str(p) for p in pe.missing_pages)
+                problems['Entries with missing page images'].append(
+                    f'{pe.title_word}: pages {missing}')
+
+    def __find_duplicates(self, batch: List[ParsedEntry],
+                          files_by_hash: Dict[str, str],
+                          problems: Dict[str, List[str]]):
+        """Add the entries of the batch whose text is not new to the report.
+
+        Parameters
+        ----------
+        batch: list of ParsedEntry, required
+            The parsed entries.
+        files_by_hash: dict of (str, str), required
+            The name of the first file with each text hash; it is updated with
+            the files of the batch.
+        problems: dict of (str, list of str), required
+            The descriptions of the problems found, indexed by category.
+        """
+        hashes = {}
+        for pe in batch:
+            if pe.status != ImportRecord.ImportStatus.IMPORTED:
                 continue
-            title_word, text = contents
-            entry = self.__normalize_entry(title_word)
-            if entry not in mappings:
-                error = f"Could not find page mappings for entry {entry}."
-                self.stderr.write(error)
+            text_hash = compute_text_hash(pe.text)
+            if text_hash in files_by_hash:
+                problems['Entries duplicated within the files'].append(
+                    f'{pe.entry_file.name} = {files_by_hash[text_hash]}')
             else:
-                offset = 0
-                if options['page_offset'] is not None:
-                    offset = int(options['page_offset'])
-                entry_pages = [p + offset for p in mappings[entry]]
-                entry_pages = [
-                    pages[page_no] for page_no in entry_pages
-                    if page_no in pages
-                ]
-                self.__import_data(entry_file, text, entry_pages, static_dir)
-
-        self.stdout.write("Finished importing data.")
-
-    def __import_data(self, entry_file: Path, text: str, pages: List[Page],
-                      static_directory: Path):
-        """Import the data into the database.
+                files_by_hash[text_hash] = pe.entry_file.name
+            hashes.setdefault(text_hash, []).append(pe.entry_file.name)
+        existing = Entry.objects.filter(text_hash__in=hashes.keys())\
+                                .values_list('text_hash', 'id')
+        for text_hash, entry_id in existing:
+            problems['Entries which already exist'].extend(
+                f'{file_name} = entry {entry_id}'
+                for file_name in hashes[text_hash])
+
+    def __write_report(self, stats: Counter, problems: Dict[str, List[str]],
+                       timings: Dict[str, float]):
+        """Write the report of a dry run.
 
         Parameters
         ----------
-        entry_file: Path, required
-            The path of the file containing the entry to import.
-        text: str, required
-            The text of the entry.
-        pages: list of int, required
-            The page numbers of the images to import.
-        static_directory: Path, required
-            The path of the directory containing static files.
+        stats: Counter, required
+            The number of files of each import status.
+        problems: dict of (str, list of str), required
+            The descriptions of the problems found, indexed by category.
+        timings: dict of (str, float), required
+            The duration of each stage, in seconds.
         """
-        entry = self.__get_or_create_entry(text)
-        message = f"Importing pages {[p.page_no for p in pages]} for entry {entry.title_word}."
-        self.stdout.write(message)
+        num_files = stats.total()
+        num_skipped = stats[None]
+        num_importable = stats[ImportRecord.ImportStatus.IMPORTED]
+        self.stdout.write(
+            f"Found {num_files} entry files: {num_importable} can be imported and {num_skipped} are unchanged since the last import.")
+
+        for category, items in problems.items():
+            if not items:
+                self.stdout.write(self.style.SUCCESS(f"{category}: none."))
+                continue
+            self.stdout.write(self.style.WARNING(f"{category}: {len(items)}."))
+            for item in items[:MAX_REPORTED_ITEMS]:
+                self.stdout.write(f"  {item}")
+            if len(items) > MAX_REPORTED_ITEMS:
+                self.stdout.write(
+                    f"  ... and {len(items) - MAX_REPORTED_ITEMS} more.")
 
-        self.__create_or_update_pages(entry, pages)
-        self.__mark_imported(entry_file)
+        for stage, elapsed in timings.items():
+            self.stdout.write(f"{stage}: {elapsed:.2f} seconds.")
+        self.stdout.write(self.style.NOTICE("Dry run: nothing was written."))
 
-    def __create_or_update_pages(self, entry: Entry, pages: List[Page]):
-        """Create or update the pages associated with the entry.
+    def __load_manifest(self, volume: Volume) -> Dict[str, str]:
+        """Load the hashes of the entry files already imported into the volume.
 
         Parameters
         ----------
-        entry: Entry, required
-            The entry for which to create or update pages.
-        pages: list of Page, required
-            The list of pages associated with the entry.
+        volume: Volume, required
+            The volume for which data is imported.
+
+        Returns
+        -------
+        manifest: dict of (str, str)
+            The hashes of the file contents indexed by file path.
         """
-        entry_pages = EntryPage.objects.filter(entry=entry)
-        for ep in entry_pages:
-            ep.delete()
+        records = ImportRecord.objects\
+            .filter(volume=volume, status=ImportRecord.ImportStatus.IMPORTED)\
+            .values_list('file_path', 'content_hash')
+        return dict(records)
 
-        for page in pages:
-            ep = EntryPage(entry=entry, page=page)
-            ep.save()
+    def __parse_entries(self, entries_dir: Path,
+                        mappings: Dict[str, List[int]], pages: Dict[int, Page],
+                        offset: int, manifest: Dict[str, str],
+                        workers: int) -> Iterator[ParsedEntry]:
+        """Parse the entry files and resolve their pages.
 
-    def __read_contents(self, entry_file: Path) -> tuple[str, str] | None:
-        """Read the contents of the entry file.
+        Files whose contents are unchanged since they were last imported are
+        returned without a status, and are not converted again.
 
         Parameters
         ----------
-        entry_file: Path, required
-            The path of the entry file.
+        entries_dir: Path, required
+            The path of the directory containing dictionary entries.
+        mappings: dict of (str, list of int), required
+            The mappings between entries and page numbers.
+        pages: dict of (int, Page), required
+            The pages of the volume indexed by page number.
+        offset: int, required
+            The page offset.
+        manifest: dict of (str, str), required
+            The hashes of the files already imported, indexed by file path.
+        workers: int, required
+            The number of processes used for reading the entry files.
 
         Returns
         -------
-        (title_word, text): tuple of (str, str) or None
-            The contents of the entry file.
+        parsed_entries: generator of ParsedEntry
+            The parsed entries, in the order of the files.
         """
-        with open(entry_file, encoding='utf8') as f:
-            contents = f.read()
-
-        text = convert_xml_to_edtlr_markdown(contents)
-        match = re.match(TITLE_WORD_REGEX, text, re.MULTILINE | re.UNICODE)
-        if match is None:
-            return None
-        return (match.group(1), text)
-
-    def __get_or_create_entry(self, text: str) -> Entry:
-        """Create an entry from the contents of the specified file.
+        entry_files = sorted(p.resolve() for p in entries_dir.glob("*.xml"))
+        for entry_file, (content_hash, contents) in self.__read_entry_files(
+                entry_files, manifest, workers):
+            if content_hash == manifest.get(str(entry_file)):
+                yield ParsedEntry(entry_file, content_hash, None)
+                continue
+            if contents is None:
+                error = f'Could not extract title word from file {entry_file}.'
+                self.stderr.write(error)
+                yield ParsedEntry(entry_file, content_hash,
+                                  ImportRecord.ImportStatus.INVALID)
+                continue
+            title_word, text = contents
+            entry = normalize_entry(title_word)
+            if entry not in mappings:
+                error = f"Could not find page mappings for entry {entry}."
+                self.stderr.write(error)
+                yield ParsedEntry(entry_file,
+                                  content_hash,
+                                  ImportRecord.ImportStatus.UNMAPPED,
+                                  title_word=entry)
+                continue
+            page_numbers = [p + offset for p in mappings[entry]]
+            yield ParsedEntry(
+                entry_file,
+                content_hash,
+                ImportRecord.ImportStatus.IMPORTED,
+                text,
+                [pages[page_no] for page_no in page_numbers if page_no in pages],
+                title_word=entry,
+                missing_pages=[p for p in page_numbers if p not in pages])
+
+    def __read_entry_files(
+        self, entry_files: Iterable[Path], manifest: Dict[str, str],
+        workers: int
+    ) -> Iterator[tuple[Path, tuple[str, tuple[str, str] | None]]]:
+        """Read and convert the entry files, using a pool of processes.
+
+        The results are returned in the order of the files. At most
+        `IN_FLIGHT_FILES_PER_WORKER` files per worker are submitted to the pool
+        before their results are consumed, which keeps the memory bounded.
 
         Parameters
         ----------
-        text: str, required
-            The text of the entry.
+        entry_files: iterable of Path, required
+            The paths of the entry files.
+        manifest: dict of (str, str), required
+            The hashes of the files already imported, indexed by file path.
+        workers: int, required
+            The number of worker processes.
 
         Returns
         -------
-        entry: Entry
-            The entry created from the contents of the file.
+        contents: generator of (Path, tuple) tuples
+            The path of each file, and its contents as returned by `read_contents`.
         """
-        entry = Entry.objects.filter(text=text).first()
-        if entry is None:
-            entry = Entry()
-            entry.set_text(text)
-            entry.save()
+        if workers <= 1:
+            for entry_file in entry_files:
+                imported_hash = manifest.get(str(entry_file))
+                yield entry_file, read_contents(entry_file, imported_hash)
+            return
+
+        window_size = workers * IN_FLIGHT_FILES_PER_WORKER
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=django.setup) as executor:
+            in_flight = deque()
+            for entry_file in entry_files:
+                future = executor.submit(read_contents, entry_file,
+                                         manifest.get(str(entry_file)))
+                in_flight.append((entry_file, future))
+                if len(in_flight) >= window_size:
+                    entry_file, future = in_flight.popleft()
+                    yield entry_file, future.result()
+            while in_flight:
+                entry_file, future = in_flight.popleft()
+                yield entry_file, future.result()
+
+    def __import_batch(self, batch: List[ParsedEntry], volume: Volume):
+        """Import a batch of parsed entries into the database.
+
+        The outcome of each file is recorded in the import manifest, in the same
+        transaction as the entries.
 
-        return entry
+        Parameters
+        ----------
+        batch: list of ParsedEntry, required
+            The parsed entries.
+        volume: Volume, required
+            The volume for which data is imported.
+        """
+        imported = [
+            pe for pe in batch
+            if pe.status == ImportRecord.ImportStatus.IMPORTED
+        ]
+        entries = self.__get_or_create_entries([pe.text for pe in imported])
+        entry_pages = {entries[pe.text].id: pe.pages for pe in imported}
+        self.__create_or_update_entry_pages(entry_pages)
+
+        records = [
+            ImportRecord(volume=volume,
+                         file_path=str(pe.entry_file),
+                         content_hash=pe.content_hash,
+                         entry=entries.get(pe.text),
+                         status=pe.status) for pe in batch
+            if pe.status is not None
+        ]
+        ImportRecord.objects.bulk_create(records,
+                                         update_conflicts=True,
+                                         unique_fields=['volume', 'file_path'],
+                                         update_fields=[
+                                             'content_hash', 'entry', 'status',
+                                             'row_update_timestamp'
+                                         ])
 
-    def __mark_imported(self, entry_file: Path):
-        """Mark the entry file as imported.
+    def __create_or_update_entry_pages(self,
+                                       entry_pages: Dict[int, List[Page]]):
+        """Create or update the pages associated with the entries.
+
+        Associations which already exist are kept, so that re-importing the
+        same data leaves the table unchanged.
 
         Parameters
         ----------
-        entry_file: Path, required
-            The path of the file from which to create an entry.
+        entry_pages: dict of (int, list of Page), required
+            The pages of each entry, indexed by entry id.
         """
-        imported_dir = entry_file.parent / "imported"
-        if not imported_dir.exists():
-            imported_dir.mkdir(exist_ok=True)
-        new_path = imported_dir / entry_file.name
-        entry_file.rename(new_path)
+        required = {(entry_id, page.id)
+                    for entry_id, pages in entry_pages.items()
+                    for page in pages}
+        existing = EntryPage.objects\
+            .filter(entry_id__in=entry_pages.keys())\
+            .values_list('id', 'entry_id', 'page_id')
+
+        obsolete, present = [], set()
+        for ep_id, entry_id, page_id in existing:
+            if (entry_id, page_id) in required:
+                present.add((entry_id, page_id))
+            else:
+                obsolete.append(ep_id)
+
+        new_entry_pages = [
+            EntryPage(entry_id=entry_id, page_id=page_id)
+            for entry_id, page_id in required - present
+        ]
+        EntryPage.objects.filter(id__in=obsolete).delete()
+        EntryPage.objects.bulk_create(new_entry_pages, ignore_conflicts=True)
+
+    def __check_text_hashes(self):
+        """Warn about the entries which cannot be matched by the hash of their text."""
+        num_unhashed = Entry.objects.filter(text_hash=None).count()
+        if num_unhashed > 0:
+            message = self.style.WARNING(
+                f"{num_unhashed} entries have no text hash, and files with the same text will be imported as new entries; run 'backfillentryhashes' first."
+            )
+            self.stdout.write(message)
+
+    def __get_or_create_entries(self, texts: List[str]) -> Dict[str, Entry]:
+        """Load the entries with the specified texts, and create the missing ones.
+
+        The existing entries are looked up by the hash of their text.
+
+        Parameters
+        ----------
+        texts: list of str, required
+            The texts of the entries.
 
-    def __create_pages(self, images: Dict[int, Path], volume: Volume,
-                       static_directory: Path) -> Dict[int, Page]:
-        """Create the pages.
+        Returns
+        -------
+        entries: dict of (str, Entry)
+            The entries indexed by their text.
+        """
+        hashes = {compute_text_hash(text): text for text in texts}
+        existing = Entry.objects.filter(text_hash__in=hashes.keys())\
+                                .only('id', 'text_hash')
+        entries = {hashes[entry.text_hash]: entry for entry in existing}
+
+        new_entries = []
+        for text in hashes.values():
+            if text not in entries:
+                entry = Entry()
+                entry.set_text(text)
+                new_entries.append(entry)
+
+        Entry.objects.bulk_create(new_entries)
+        entries.update({entry.text: entry for entry in new_entries})
+        return entries
+
+    def __create_pages(self, images: Dict[int, ImageInfo], volume: Volume,
+                       static_directory: Path,
+                       batch_size: int) -> Dict[int, Page]:
+        """Create the pages, or update the existing ones.
 
         Parameters
         ----------
-        images: dict of (int, Path), required
-            The dictionary mapping the page number to its file path.
+        images: dict of (int, ImageInfo), required
+            The dictionary mapping the page number to its image.
         volume: Volume, required
             The volume for which data is imported.
         static_directory: Path, required
             The path of the directory containing static files.
+        batch_size: int, required
+            The number of pages to insert in each statement.
 
         Returns
         -------
-        page_list: list of Page
-            The list of inserted pages.
+        pages: dict of (int, Page)
+            The pages of the volume indexed by page number.
         """
-        pages = {}
-        for (page_no, image_path) in images.items():
-            page = self.__create_or_update_page(page_no, volume, image_path,
-                                                static_directory)
-            pages[page.page_no] = page
-
-        return pages
-
-    def __create_or_update_page(self, page_no: int, volume: Volume,
-                                image_path: Path, static_dir: Path) -> Page:
-        """Create a page or update the page with the specified data.
+        pages = self.__build_pages(images, volume, static_directory)
+        with transaction.atomic():
+            Page.objects.bulk_create(
+                pages,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['volume', 'page_no'],
+                update_fields=[
+                    'image_path', 'image_hash', 'width', 'height', 'byte_size'
+                ])
+
+        return {p.page_no: p for p in Page.objects.filter(volume=volume)}
+
+    def __build_pages(self, images: Dict[int, ImageInfo], volume: Volume,
+                      static_directory: Path) -> List[Page]:
+        """Build the pages of the images, without saving them.
 
         Parameters
         ----------
-        page_no: int, required
-            The number of the page in the volume.
+        images: dict of (int, ImageInfo), required
+            The dictionary mapping the page number to its image.
         volume: Volume, required
-            The volume which contains the page.
-        image_path: Path, required
-            The path of the page scan.
-        static_dir: Path, required
-            The path of the static directory.
+            The volume for which data is imported.
+        static_directory: Path, required
+            The path of the directory containing static files.
 
         Returns
         -------
-        page: Page
-            The page object.
+        pages: list of Page
+            The unsaved pages.
         """
-        p = Page.objects.filter(volume=volume, page_no=page_no).first()
-        page_path = image_path.relative_to(static_dir)
-        if p is None:
-            p = Page(volume=volume, page_no=page_no, image_path=str(page_path))
-        else:
-            p.image_path = str(page_path)
-
-        p.save()
-        return p
+        return [
+            Page(volume=volume,
+                 page_no=page_no,
+                 image_path=str(image.path.relative_to(static_directory)),
+                 image_hash=image.checksum,
+                 width=image.width,
+                 height=image.height,
+                 byte_size=image.byte_size)
+            for page_no, image in images.items()
+        ]
 
     def __load_volume(self, volume_name: str,
                       dictionary: Dictionary) -> Volume:
@@ -307,88 +679,63 @@ class Command(BaseCommand):
 
     def __scan_images(self,
                       directory: Path,
-                      extension: str = "png") -> Dict[int, Path]:
-        """Scan the provided diectory for imges.
+                      threads: int,
+                      extension: str = "png") -> Dict[int, ImageInfo]:
+        """Scan the provided directory for images, and read their properties.
+
+        The images are read in a pool of threads, since the time is spent
+        waiting for the disk and hashing, both of which release the GIL.
 
         Parameters
         ----------
         directory: Path, required
             The path of the directory to scan.
+        threads: int, required
+            The number of threads used for reading the images.
         extension: str, optional
             The extension of the images.
-        """
-        results = {}
-        for img in directory.glob(f'*.{extension}'):
-            self.stdout.write(str(img))
-            match = re.search(r'\d+', img.stem)
-            if match:
-                results[int(match.group())] = img
-        return results
-
-    def __load_mappings(self, mappings_file: Path,
-                        parse_strategy: str) -> Dict[str, List[int]]:
-        """Load the entry-page mappings from the provided file.
-
-        Parameters
-        ----------
-        mappings_file: Path, required
-            The path of the CSV file from which to load the mapping.
-        parse_strategy: str, required
-            The strategy used to extract the entry from the mapping table.
 
         Returns
         -------
-        mappings: dict of (str, list of str) tuples
-            The mappings as a dict with the entry as the key, and the list of page numbers as values.
+        images: dict of (int, ImageInfo)
+            The images indexed by page number.
         """
-        df = pd.read_csv(mappings_file,
-                         header=None,
-                         names=['entry', 'pages'],
-                         na_values='',
-                         dtype=str)
-        result = {}
-        for row in df.itertuples():
-            entry = row.entry
-            if parse_strategy == Command.EntryParsingStrategy.TAKE_FIRST_WORD:
-                entry, *_ = row.entry.split()
-            if len(str(row.pages)) == 0:
-                continue
-
-            pages = [int(num) for num in row.pages.split(',')]
-            entry = self.__normalize_entry(entry)
-            if entry in result:
-                s1 = set(result[entry])
-                s2 = set(pages)
-                result[entry] = list(s1.union(s2))
-            else:
-                result[entry] = list(set(pages))
-
-        return result
+        suffix = f'.{extension}'
+        image_paths = {}
+        with os.scandir(directory) as it:
+            for dir_entry in it:
+                if not dir_entry.name.endswith(suffix) or not dir_entry.is_file():
+                    continue
+                match = re.search(r'\d+', dir_entry.name[:-len(suffix)])
+                if match:
+                    image_paths[int(match.group())] = Path(dir_entry.path)
+
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(threads, 1)) as executor:
+            images = dict(
+                zip(image_paths.keys(),
+                    executor.map(read_image_info, image_paths.values())))
+        elapsed = time.perf_counter() - start_time
+        num_bytes = sum(image.byte_size for image in images.values())
+        message = f"Scanned {len(images)} images ({num_bytes / (1024 * 1024):.1f} MB) in {elapsed:.1f} seconds."
+        self.stdout.write(message)
+        return images
 
-    def __normalize_entry(self, entry: str) -> str:
-        """Remove problematic characters from the given entry.
+    def __chunk(self, collection, batch_size: int):
+        """Split the specified collection into batches.
 
         Parameters
         ----------
-        entry: str, required
-            The entry to sanitize.
+        collection: iterable, required
+            The collection to split.
+        batch_size: int, required
+            The number of items in each batch.
 
         Returns
         -------
-        canonical_entry: str
-            The normalized entry.
+        batches: generator
+            The generator that returns each batch.
         """
-        if entry is None:
-            return ""
-        entry = entry.strip()
-        if len(entry) == 0:
-            return ""
-
-        entry, *_ = entry.split()
-        entry = entry.upper()
-        entry = entry.translate(REPLACEMENT_MAP)
-        letters = [
-            letter for letter in takewhile(lambda c: c.isalpha(), entry)
-        ]
-        canonical_entry = ''.join(letters)
-        return canonical_entry
+        iterator = iter(collection)
+        while batch := list(itertools.islice(iterator, batch_size)):
+            yield batch
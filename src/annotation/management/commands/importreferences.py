@@ -3,6 +3,7 @@ from django.core.management.base import BaseCommand
 from django.core.management.base import CommandError
 from annotation.models.reference import Reference
 from pathlib import Path
+from typing import Iterable
 
 
 class Command(BaseCommand):
@@ -22,52 +23,70 @@ class Command(BaseCommand):
         parser.add_argument('--input-file',
                             type=str,
                             help="The path of the input file.")
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=1000,
+                            help="Number of records to process in each batch")
 
     def handle(self, *args, **options):
         """Import the references."""
         input_file = Path(options['input_file'])
-        references = self.__load_references(input_file)
-        self.__import_references(references)
+        self.__check_input_file(input_file)
 
-    def __import_references(self, references: list[str]):
+        num_existing = Reference.objects.count()
+        # The file is read line by line, so that only the distinct
+        # references are kept in memory.
+        with open(input_file, 'r') as file:
+            num_lines, num_unique = self.__import_references(
+                file, options['batch_size'])
+        num_inserted = Reference.objects.count() - num_existing
+
+        message = f"Inserted {num_inserted} references from {num_lines} lines; {num_unique - num_inserted} references already existed and {num_lines - num_unique} lines were empty or duplicates."
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def __import_references(self, references: Iterable[str],
+                            batch_size: int) -> tuple[int, int]:
         """Import the provided references.
 
         Parameters
         ----------
-        references: list of str, required
+        references: iterable of str, required
             The references to insert.
+        batch_size: int, required
+            The number of references to insert in each statement.
+
+        Returns
+        -------
+        (num_lines, num_unique): tuple of (int, int)
+            The number of references read, and the number of distinct
+            non-empty references among them.
         """
+        seen = set()
+        batch = []
+        num_lines = 0
         for ref_text in references:
+            num_lines += 1
             ref_text = ref_text.strip()
-            if not Reference.objects.filter(text=ref_text).exists():
-                Reference.objects.create(text=ref_text, is_approved=True)
-                message = self.style.SUCCESS(
-                    f"Inserted reference with text '{ref_text}'.")
-                self.stdout.write(message)
-            else:
-                message = self.style.WARNING(
-                    f"Reference with text '{ref_text}' already exists.")
-                self.stdout.write(message)
+            if not ref_text or ref_text in seen:
+                continue
+            seen.add(ref_text)
+            batch.append(Reference(text=ref_text, is_approved=True))
+            if len(batch) >= batch_size:
+                Reference.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        Reference.objects.bulk_create(batch, ignore_conflicts=True)
+        return num_lines, len(seen)
 
-    def __load_references(self, input_file: Path) -> list[str]:
-        """Load the references from the providef input file.
+    def __check_input_file(self, input_file: Path):
+        """Check that the input file exists.
 
         Parameters
         ----------
         input_file: Path, required
             The path of the input file.
-
-        Returns
-        -------
-        references: list of str
-            The list of references loaded from the file.
         """
         if not input_file.exists():
             raise CommandError(f"File '{input_file}' does not exist.")
 
         if not input_file.is_file():
             raise CommandError(f"The path '{input_file}' is not a file.")
-
-        with open(input_file, 'r') as file:
-            references = file.readlines()
-        return references
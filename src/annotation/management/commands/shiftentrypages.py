@@ -1,5 +1,7 @@
 """Defines the command for shifting the pages of the entries of a dictionary volume."""
 from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
 from annotation.models import EntryPage
 from annotation.models import Volume
 from annotation.models import Page
@@ -30,6 +32,10 @@ class Command(BaseCommand):
                             type=int,
                             help="The page offset.",
                             default=0)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Print the number of entry pages to shift without changing them.")
 
     def handle(self, *args, **kwargs):
         """Shift the entry pages."""
@@ -45,28 +51,95 @@ class Command(BaseCommand):
             )
             self.stdout.write(message)
             return
+        if page_offset == 0:
+            self.stdout.write(self.style.WARNING("The page offset is 0."))
+            return
 
-        pages_by_no, pages_by_id = {}, {}
-        for page in Page.objects.filter(volume=volume):
-            pages_by_no[page.page_no] = page
-            pages_by_id[page.id] = page
+        # The pages which have a counterpart with the shifted number.
+        shifted_page_no = OuterRef('page_no') + page_offset
+        shifted_pages = Page.objects.filter(volume=volume).filter(
+            Exists(Page.objects.filter(volume=volume,
+                                       page_no=shifted_page_no)))
+        entry_pages = EntryPage.objects.filter(page__volume=volume)
+        movable = entry_pages.filter(page__in=shifted_pages)
+        unshifted = entry_pages.exclude(page__in=shifted_pages)
+        # An entry page collides with another one if its entry is already
+        # linked to the shifted page, and that link stays in place.
+        shifted_entry_page_no = OuterRef('page__page_no') + page_offset
+        collisions = movable.filter(
+            Exists(
+                unshifted.filter(entry_id=OuterRef('entry_id'),
+                                 page__page_no=shifted_entry_page_no)))
 
-        entry_pages = list(EntryPage.objects.filter(page__volume=volume)\
-                           .order_by('entry_id'))
-        for ep in entry_pages:
-            current_page = pages_by_id[ep.page_id]
-            new_page = pages_by_no[current_page.page_no + page_offset]
-            entry = ep.entry
-            message = self.style.NOTICE(
-                f"Shifting ({ep.entry}, {ep.page}) to ({ep.entry}, {new_page})."
-            )
-            self.stdout.write(message)
-            if EntryPage.objects.filter(entry=ep.entry,
-                                        page=new_page).exists():
-                message = self.style.NOTICE(
-                    f"Entry ({ep.entry}, {ep.page}) already exists.")
-                self.stdout.write(message)
-            else:
-                ep.delete()
-                ep = EntryPage(entry=entry, page=new_page)
-                ep.save()
+        if kwargs['dry_run']:
+            num_collisions = collisions.count()
+            self.stdout.write(
+                self.style.NOTICE(
+                    f"Entry pages of the volume: {entry_pages.count()}."))
+            self.stdout.write(
+                self.style.NOTICE(
+                    f"Entry pages to shift: {movable.count() - num_collisions}."))
+            self.stdout.write(
+                self.style.NOTICE(
+                    f"Entry pages to remove, since their entry is already on the shifted page: {num_collisions}."
+                ))
+            self.stdout.write(
+                self.style.NOTICE(
+                    f"Entry pages without a shifted page, which are not changed: {unshifted.count()}."
+                ))
+            return
+
+        with transaction.atomic():
+            num_collisions, _ = collisions.delete()
+            num_shifted = self.__shift(volume, page_offset)
+        message = f"Shifted {num_shifted} entry pages, and removed {num_collisions} which were already on the shifted page."
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def __shift(self, volume: Volume, page_offset: int) -> int:
+        """Link the entries of the volume to the pages with shifted numbers.
+
+        The page ids are updated in two statements, since a single one could
+        temporarily link an entry twice to the same page, which violates
+        the unique constraint of the table: the first statement stores the
+        negated ids of the shifted pages, and the second one restores their
+        sign. The foreign key is only checked when the transaction commits.
+
+        Parameters
+        ----------
+        volume: Volume, required
+            The volume of the pages.
+        page_offset: int, required
+            The page offset.
+
+        Returns
+        -------
+        num_shifted: int
+            The number of shifted entry pages.
+        """
+        entry_page_table = connection.ops.quote_name(EntryPage._meta.db_table)
+        page_table = connection.ops.quote_name(Page._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {entry_page_table}
+                SET page_id = -(
+                    SELECT shifted.id
+                    FROM {page_table} p
+                    JOIN {page_table} shifted
+                        ON shifted.volume_id = p.volume_id
+                        AND shifted.page_no = p.page_no + %s
+                    WHERE p.id = {entry_page_table}.page_id)
+                WHERE page_id IN (
+                    SELECT p.id
+                    FROM {page_table} p
+                    JOIN {page_table} shifted
+                        ON shifted.volume_id = p.volume_id
+                        AND shifted.page_no = p.page_no + %s
+                    WHERE p.volume_id = %s)""",
+                [page_offset, page_offset, volume.id])
+            num_shifted = cursor.rowcount
+            cursor.execute(f"""
+                UPDATE {entry_page_table}
+                SET page_id = -page_id
+                WHERE page_id < 0""")
+        return num_shifted
@@ -1,32 +1,79 @@
 """Defines the command to update metadata columns."""
+from annotation.management.batchrunner import BatchRunner
+from annotation.management.batchrunner import Checkpoint
 from annotation.models import Annotation
 from annotation.models import Entry
 from annotation.models import extract_title_word
 from annotation.models import remove_diacritics
 from django.core.management.base import BaseCommand
+from pathlib import Path
+from typing import Optional
+
+METADATA_FIELDS = ['text_length', 'title_word', 'title_word_normalized']
+
+
+def compute_metadata(row: dict) -> Optional[dict]:
+    """Compute the metadata of the text of a row.
+
+    Parameters
+    ----------
+    row: dict, required
+        The id, the text and the current values of `METADATA_FIELDS`.
+
+    Returns
+    -------
+    metadata: dict, optional
+        The values of `METADATA_FIELDS`, or `None` if they did not change.
+    """
+    title_word = extract_title_word(row['text'])
+    metadata = {
+        'text_length': len(row['text']),
+        'title_word': title_word,
+        'title_word_normalized': remove_diacritics(title_word),
+    }
+    if all(row[field] == value for field, value in metadata.items()):
+        return None
+    return metadata
 
 
 class Command(BaseCommand):
     """Update the metadata columns."""
 
+    def add_arguments(self, parser):
+        """Add command-line arguments.
+
+        Parameters
+        ----------
+        parser: argparse.Parser, required
+            The arguments parser.
+        """
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=1000,
+                            help="Number of records to process in each batch")
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help="Number of processes used for computing the metadata.")
+        parser.add_argument(
+            '--checkpoint-file',
+            help="The file storing the last updated id, used to resume an interrupted run.")
+
     def handle(self, *args, **options):
         """Update the metadata in the database."""
-        self.__update_entry_metadata()
-        self.__update_annotation_metadata()
-
-    def __update_entry_metadata(self):
-        """Update the metadata of the `Entry` model."""
-        for entry in Entry.objects.all():
-            entry.text_length = len(entry.text)
-            entry.title_word = extract_title_word(entry.text)
-            entry.title_word_normalized = remove_diacritics(entry.title_word)
-            entry.save()
-
-    def __update_annotation_metadata(self):
-        """Update the metadata for the `Annotation` model."""
-        for annotation in Annotation.objects.all():
-            annotation.text_length = len(annotation.text)
-            annotation.title_word = extract_title_word(annotation.text)
-            annotation.title_word_normalized = remove_diacritics(
-                annotation.title_word)
-            annotation.save()
+        checkpoint_file = options['checkpoint_file']
+        checkpoint = Checkpoint(
+            Path(checkpoint_file) if checkpoint_file is not None else None)
+        for model, name in [(Entry, 'entries'), (Annotation, 'annotations')]:
+            runner = BatchRunner(model.objects.all(),
+                                 compute_metadata, ['text', *METADATA_FIELDS],
+                                 METADATA_FIELDS,
+                                 batch_size=options['batch_size'],
+                                 workers=options['workers'],
+                                 checkpoint=checkpoint,
+                                 report=self.stdout.write)
+            summary = runner.run()
+            message = f"Updated the metadata of {summary.num_updated} of {summary.num_processed} {name} in {summary.elapsed:.1f} seconds ({summary.rate:.0f} rows per second)."
+            self.stdout.write(self.style.SUCCESS(message))
+        checkpoint.clear()
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('annotation', '0020_alter_volume_dictionary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='width',
+            field=models.PositiveIntegerField(null=True, verbose_name='width'),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='height',
+            field=models.PositiveIntegerField(null=True, verbose_name='height'),
+        ),
+    ]
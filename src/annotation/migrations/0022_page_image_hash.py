@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-18 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('annotation', '0021_page_width_page_height'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='image_hash',
+            field=models.CharField(blank=True, default='', max_length=32, verbose_name='image hash'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-18 22:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('annotation', '0022_page_image_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entry',
+            name='text_hash',
+            field=models.CharField(max_length=64, null=True, unique=True, verbose_name='text hash'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.4 on 2026-10-18 22:52
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('annotation', '0023_entry_text_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRecord',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False, verbose_name='id')),
+                ('file_path', models.CharField(max_length=1024, verbose_name='file path')),
+                ('content_hash', models.CharField(max_length=32, verbose_name='content hash')),
+                ('status', models.CharField(choices=[('Imported', 'Imported'), ('Invalid', 'Invalid'), ('Unmapped', 'Unmapped')], max_length=32, verbose_name='status')),
+                ('row_creation_timestamp', models.DateTimeField(default=django.utils.timezone.now, verbose_name='row creation timestamp')),
+                ('row_update_timestamp', models.DateTimeField(auto_now=True, null=True, verbose_name='row update timestamp')),
+                ('entry', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='annotation.entry', verbose_name='entry')),
+                ('volume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='annotation.volume', verbose_name='volume')),
+            ],
+            options={
+                'verbose_name': 'import record',
+                'verbose_name_plural': 'import records',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='importrecord',
+            constraint=models.UniqueConstraint(fields=('volume', 'file_path'), name='UX_volume_id_file_path'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-18 22:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('annotation', '0024_importrecord'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='byte_size',
+            field=models.PositiveBigIntegerField(null=True, verbose_name='byte size'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.4 on 2026-10-18 23:04
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('annotation', '0025_page_byte_size'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportedEntry',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False, verbose_name='id')),
+                ('target', models.CharField(max_length=1024, verbose_name='export target')),
+                ('version', models.PositiveSmallIntegerField(verbose_name='version')),
+                ('file_name', models.CharField(max_length=1024, verbose_name='file name')),
+                ('row_creation_timestamp', models.DateTimeField(default=django.utils.timezone.now, verbose_name='row creation timestamp')),
+                ('row_update_timestamp', models.DateTimeField(auto_now=True, null=True, verbose_name='row update timestamp')),
+                ('annotation', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='annotation.annotation', verbose_name='annotation')),
+                ('entry', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='annotation.entry', verbose_name='entry')),
+            ],
+            options={
+                'verbose_name': 'exported entry',
+                'verbose_name_plural': 'exported entries',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='exportedentry',
+            constraint=models.UniqueConstraint(fields=('target', 'entry'), name='UX_target_entry_id'),
+        ),
+    ]
@@ -3,8 +3,11 @@ from .annotation import Annotation
 from .entry import Entry
 from .entrypage import EntryPage
 from .evaluationinterval import EvaluationInterval
+from .exportedentry import ExportedEntry
+from .importrecord import ImportRecord
 from .page import Page
 from .reference import Reference
+from .utils import compute_text_hash
 from .utils import extract_title_word
 from .utils import remove_diacritics
 from .volume import Volume
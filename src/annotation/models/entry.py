@@ -1,4 +1,5 @@
 """Defines the Entry model."""
+from annotation.models.utils import compute_text_hash
 from annotation.models.utils import extract_title_word
 from annotation.models.utils import remove_diacritics
 from django.db import models
@@ -10,6 +11,10 @@ class Entry(models.Model):
 
     id = models.AutoField(verbose_name="id", primary_key=True)
     text = models.TextField(max_length=250_000, null=False)
+    text_hash = models.CharField(max_length=64,
+                                 null=True,
+                                 unique=True,
+                                 verbose_name=_('text hash'))
 
     title_word = models.TextField(max_length=100,
                                   null=False,
@@ -37,6 +42,7 @@ class Entry(models.Model):
             The text of the enty.
         """
         self.text = text
+        self.text_hash = compute_text_hash(text)
         self.text_length = len(text)
         self.title_word = extract_title_word(text)
         self.title_word_normalized = remove_diacritics(self.title_word)
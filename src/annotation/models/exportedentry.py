@@ -0,0 +1,57 @@
+"""Defines the ExportedEntry model."""
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from .annotation import Annotation
+from .entry import Entry
+
+
+class ExportedEntry(models.Model):
+    """Records the annotation which was exported last for an entry to a target.
+
+    The target identifies the output of an incremental export: the format and
+    the path of the output directory, or of the single output file.
+    """
+
+    class Meta:
+        """Defines the metadata of the ExportedEntry model."""
+
+        verbose_name = _('exported entry')
+        verbose_name_plural = _('exported entries')
+        constraints = [
+            models.UniqueConstraint(fields=['target', 'entry'],
+                                    name='UX_target_entry_id')
+        ]
+
+    id = models.AutoField(verbose_name='id', primary_key=True)
+    target = models.CharField(null=False,
+                              max_length=1024,
+                              verbose_name=_('export target'))
+    # The entry is not constrained, so that the record of an entry which was
+    # deleted is kept until its deletion is exported.
+    entry = models.ForeignKey(Entry,
+                              on_delete=models.DO_NOTHING,
+                              db_constraint=False,
+                              verbose_name=_('entry'))
+    annotation = models.ForeignKey(Annotation,
+                                   on_delete=models.SET_NULL,
+                                   null=True,
+                                   verbose_name=_('annotation'))
+    version = models.PositiveSmallIntegerField(verbose_name=_('version'))
+    file_name = models.CharField(null=False,
+                                 max_length=1024,
+                                 verbose_name=_('file name'))
+    row_creation_timestamp = models.DateTimeField(
+        verbose_name=_('row creation timestamp'),
+        blank=False,
+        null=False,
+        default=timezone.now)
+    row_update_timestamp = models.DateTimeField(
+        verbose_name=_('row update timestamp'),
+        blank=False,
+        null=True,
+        auto_now=True)
+
+    def __str__(self):
+        """Override the string representation of the model."""
+        return str(self.file_name)
@@ -0,0 +1,60 @@
+"""Defines the ImportRecord model."""
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from .entry import Entry
+from .volume import Volume
+
+
+class ImportRecord(models.Model):
+    """Records the outcome of importing an entry file into a volume."""
+
+    class ImportStatus(models.TextChoices):
+        """Defines the possible values of an import status."""
+
+        IMPORTED = 'Imported', _('Imported')
+        INVALID = 'Invalid', _('Invalid')
+        UNMAPPED = 'Unmapped', _('Unmapped')
+
+    class Meta:
+        """Defines the metadata of the ImportRecord model."""
+
+        verbose_name = _('import record')
+        verbose_name_plural = _('import records')
+        constraints = [
+            models.UniqueConstraint(fields=['volume', 'file_path'],
+                                    name='UX_volume_id_file_path')
+        ]
+
+    id = models.AutoField(verbose_name='id', primary_key=True)
+    volume = models.ForeignKey(Volume,
+                               on_delete=models.CASCADE,
+                               verbose_name=_('volume'))
+    file_path = models.CharField(null=False,
+                                 max_length=1024,
+                                 verbose_name=_('file path'))
+    content_hash = models.CharField(null=False,
+                                    max_length=32,
+                                    verbose_name=_('content hash'))
+    entry = models.ForeignKey(Entry,
+                              on_delete=models.SET_NULL,
+                              null=True,
+                              verbose_name=_('entry'))
+    status = models.CharField(max_length=32,
+                              choices=ImportStatus,
+                              null=False,
+                              verbose_name=_('status'))
+    row_creation_timestamp = models.DateTimeField(
+        verbose_name=_('row creation timestamp'),
+        blank=False,
+        null=False,
+        default=timezone.now)
+    row_update_timestamp = models.DateTimeField(
+        verbose_name=_('row update timestamp'),
+        blank=False,
+        null=True,
+        auto_now=True)
+
+    def __str__(self):
+        """Override the string representation of the model."""
+        return str(self.file_path)
@@ -18,6 +18,15 @@ class Page(models.Model):
                                   null=False,
                                   max_length=1024,
                                   verbose_name=_('image path'))
+    image_hash = models.CharField(null=False,
+                                  blank=True,
+                                  default='',
+                                  max_length=32,
+                                  verbose_name=_('image hash'))
+    width = models.PositiveIntegerField(null=True, verbose_name=_('width'))
+    height = models.PositiveIntegerField(null=True, verbose_name=_('height'))
+    byte_size = models.PositiveBigIntegerField(null=True,
+                                               verbose_name=_('byte size'))
 
     def __str__(self):
         """Override the string representation of the model."""
@@ -1,4 +1,5 @@
 """Defines utility methods."""
+import hashlib
 import re
 import unicodedata
 
@@ -40,3 +41,19 @@ def remove_diacritics(text: str) -> str | None:
     """
     nfkd_form = unicodedata.normalize('NFKD', text)
     return ''.join([c for c in nfkd_form if not unicodedata.combining(c)])
+
+
+def compute_text_hash(text: str) -> str:
+    """Compute the hash used for finding entries by their text.
+
+    Parameters
+    ----------
+    text: str, required
+        The text for which to compute the hash.
+
+    Returns
+    -------
+    hash_str: str
+        The hexadecimal SHA-256 digest of the text.
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
@@ -25439,4 +25439,4 @@ function createDictmarkdownMergeEditor(parent, options) {
 }
 
 export { createDictmarkdownEditor, createDictmarkdownMergeEditor };
-//# sourceMappingURL=dictmarkdown-editor.esm.js.map
+//# sourceMappingURL=dictmarkdown-editor.js.map
@@ -13,12 +13,26 @@ class PageCarousel {
             DomUtils.setElementVisible(this.btnNextPage, false);
         }
 
+        // Fetch the page following the visible one once the visible page is loaded.
+        if (images.length > 1) {
+            const firstImage = images[0];
+            if (firstImage.complete) {
+                PageCarousel.loadImage(images[1]);
+            }else{
+                firstImage.addEventListener('load', () => PageCarousel.loadImage(images[1]), {once: true});
+            }
+        }
+
         this.carousel.addEventListener('slide.bs.carousel', function (eventArgs) {
             const {target, from, to} = eventArgs;
             const buttons = Array.from(target.getElementsByTagName("button"));
             const btnPrevPage = buttons[0];
             const btnNextPage = buttons[1];
             const images = Array.from(target.getElementsByTagName("img"));
+
+            // Load the target page immediately, and the one after it in the background.
+            PageCarousel.loadImage(images[to], "high");
+            PageCarousel.loadImage(images[to + 1]);
             
             if (to === 0) {
                 DomUtils.setElementVisible(btnPrevPage, false);
@@ -47,6 +61,14 @@ class PageCarousel {
         });
     }
 
+    static loadImage(img, priority = "low") {
+        if (img == null || img.loading !== "lazy") {
+            return;
+        }
+        img.fetchPriority = priority;
+        img.loading = "eager";
+    }
+
     static updateZoom(slider, imgElement) {
         const zoomLevel = slider.value;
         imgElement.classList.toggle('w-100', zoomLevel==1);
@@ -0,0 +1,78 @@
+"""Defines the storage used for static files."""
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from pathlib import Path
+import gzip
+
+PAGE_IMAGES_PREFIX = getattr(settings, 'PAGE_IMAGES_PREFIX', 'annotation/data/')
+COMPRESSED_EXTENSIONS = ('.js', '.css', '.map', '.svg')
+
+
+class HashedStaticFilesStorage(ManifestStaticFilesStorage):
+    """Stores static assets under names which contain a hash of their contents.
+
+    Page images are left out of the manifest: `collectstatic` still copies them,
+    but there are too many of them to hash and rename in its post-processing
+    step, and their URLs are versioned with `Page.image_hash` instead.
+
+    Text assets are also written as precompressed `.gz` siblings, which NginX
+    serves through `gzip_static`.
+    """
+
+    support_js_module_import_aggregation = True
+
+    def post_process(self, paths, dry_run=False, **options):
+        """Post process the collected files, skipping page images."""
+        paths = {
+            path: value
+            for path, value in paths.items() if not self.is_page_image(path)
+        }
+        stored_names = {}
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if isinstance(hashed_name, str):
+                stored_names[name] = hashed_name
+            yield name, hashed_name, processed
+
+        if not dry_run:
+            for name, hashed_name in stored_names.items():
+                self.compress(name)
+                self.compress(hashed_name)
+
+    def compress(self, name: str):
+        """Write the gzip-compressed version of the specified file next to it.
+
+        Parameters
+        ----------
+        name: str, required
+            The name of the file relative to the static directory.
+        """
+        if not name.endswith(COMPRESSED_EXTENSIONS):
+            return
+        path = Path(self.path(name))
+        contents = path.read_bytes()
+        compressed = gzip.compress(contents, compresslevel=9, mtime=0)
+        if len(compressed) < len(contents):
+            path.with_name(f'{path.name}.gz').write_bytes(compressed)
+
+    def stored_name(self, name):
+        """Get the name of the stored file, which is unchanged for page images."""
+        if self.is_page_image(name):
+            return name
+        return super().stored_name(name)
+
+    @staticmethod
+    def is_page_image(name: str) -> bool:
+        """Check whether the file with the specified name is a page image.
+
+        Parameters
+        ----------
+        name: str, required
+            The name of the file relative to the static directory.
+
+        Returns
+        -------
+        is_page_image: bool
+            True if the file is stored in the directory of page images; False otherwise.
+        """
+        return name.lstrip('/').startswith(PAGE_IMAGES_PREFIX)
@@ -1,3 +1,694 @@
+from annotation.models import Annotation
+from annotation.models import Dictionary
+from annotation.models import Entry
+from annotation.models import EntryPage
+from annotation.models import ExportedEntry
+from annotation.models import ImportRecord
+from annotation.models import Page
+from annotation.models import Reference
+from annotation.models import Volume
+from annotation.utils.images import PNG_SIGNATURE
+from annotation.models import compute_text_hash
+from annotation.utils.mappings import iter_mappings
+from annotation.utils.mappings import load_mappings
+from annotation.views.viewsettings import PAGE_IMAGES_INTERNAL_URL
+from django.contrib.auth.models import User
+from django.core.management import CommandError
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase
 from django.test import TestCase
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from io import StringIO
+import json
+import pyarrow.parquet as pq
+import struct
+from pathlib import Path
+import tempfile
+import unittest
 
-# Create your tests here.
+
+@override_settings(DEBUG=False)
+class PageImageViewTests(TestCase):
+    """Tests the access checks of the view which serves page images."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create an entry on a page, and a user who annotates it."""
+        dictionary = Dictionary.objects.create(name='DLR')
+        volume = Volume.objects.create(name='Vol. I', dictionary=dictionary)
+        cls.page = Page.objects.create(volume=volume,
+                                       page_no=1,
+                                       image_path='data/images/page-1.png',
+                                       image_hash='0123456789abcdef')
+        entry = Entry()
+        entry.set_text('**ABC** text')
+        entry.save()
+        EntryPage.objects.create(entry=entry, page=cls.page)
+
+        cls.annotator = User.objects.create_user('annotator')
+        Annotation.objects.create(entry=entry, user=cls.annotator, version=1)
+        cls.other_user = User.objects.create_user('other')
+
+    def get_image(self, user, version=None):
+        """Request the image of the test page as the specified user."""
+        self.client.force_login(user)
+        url = reverse('annotation:page-image', args=[self.page.id])
+        data = {'v': version} if version is not None else {}
+        return self.client.get(url, data)
+
+    def test_annotator_gets_accel_redirect(self):
+        response = self.get_image(self.annotator)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'],
+                         f'{PAGE_IMAGES_INTERNAL_URL}data/images/page-1.png')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response.content, b'')
+
+    def test_versioned_url_is_immutable(self):
+        response = self.get_image(self.annotator, '0123456789ab')
+        self.assertIn('immutable', response['Cache-Control'])
+
+        response = self.get_image(self.annotator, 'fedcba987654')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+        response = self.get_image(self.annotator, '0123')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_other_user_is_denied(self):
+        response = self.get_image(self.other_user)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.has_header('X-Accel-Redirect'))
+
+    def test_missing_page(self):
+        self.client.force_login(self.annotator)
+        url = reverse('annotation:page-image', args=[self.page.id + 1])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_anonymous_user_is_redirected_to_login(self):
+        url = reverse('annotation:page-image', args=[self.page.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql',
+                     'COPY requires PostgreSQL.')
+class CopyLoadTests(TestCase):
+    """Tests the command which loads mappings and references with COPY."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a volume with three pages and an imported entry."""
+        dictionary = Dictionary.objects.create(name='DLR')
+        cls.volume = Volume.objects.create(name='Vol. I',
+                                           dictionary=dictionary)
+        cls.pages = [
+            Page.objects.create(volume=cls.volume,
+                                page_no=page_no,
+                                image_path=f'data/images/page-{page_no}.png')
+            for page_no in range(1, 4)
+        ]
+        cls.entry = Entry()
+        cls.entry.set_text('**ABA^1^**, *s.* text')
+        cls.entry.save()
+        ImportRecord.objects.create(volume=cls.volume,
+                                    file_path='/data/entries/aba.xml',
+                                    content_hash='0123456789abcdef',
+                                    entry=cls.entry,
+                                    status=ImportRecord.ImportStatus.IMPORTED)
+
+    def setUp(self):
+        """Create the directory of the input files."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_file(self, name, contents):
+        """Write the input file with the specified name and contents."""
+        path = Path(self.directory.name) / name
+        path.write_text(contents, encoding='utf8')
+        return str(path)
+
+    def test_mappings_link_imported_entries(self):
+        mappings_file = self.write_file(
+            'mappings.csv', 'ABA s.,"1,2"\nABA v.,"2"\nABC s.,"3"\n')
+        call_command('copyload',
+                     mappings_file=mappings_file,
+                     dictionary='DLR',
+                     volume='Vol. I',
+                     page_offset=1,
+                     stdout=StringIO())
+
+        page_ids = EntryPage.objects.filter(entry=self.entry)\
+                                    .values_list('page_id', flat=True)
+        self.assertEqual(set(page_ids), {self.pages[1].id, self.pages[2].id})
+
+    def test_empty_title_words_are_skipped(self):
+        suffix = Entry()
+        suffix.set_text('**-AR** suffix')
+        suffix.save()
+        ImportRecord.objects.create(volume=self.volume,
+                                    file_path='/data/entries/ar.xml',
+                                    content_hash='fedcba9876543210',
+                                    entry=suffix,
+                                    status=ImportRecord.ImportStatus.IMPORTED)
+        mappings_file = self.write_file(
+            'mappings.csv', '-AR s.,"1"\n² x,"2"\nABA s.,"1"\n')
+        call_command('copyload',
+                     mappings_file=mappings_file,
+                     dictionary='DLR',
+                     volume='Vol. I',
+                     stdout=StringIO())
+
+        entry_pages = EntryPage.objects.values_list('entry_id', 'page_id')
+        self.assertEqual(list(entry_pages), [(self.entry.id, self.pages[0].id)])
+
+    def test_references_are_stripped_and_deduplicated(self):
+        Reference.objects.create(text='DA', is_approved=True)
+        references_file = self.write_file('references.txt',
+                                          'DA\n LM \n\nLM\n"ALR", 2\n')
+        call_command('copyload',
+                     references_file=references_file,
+                     stdout=StringIO())
+
+        texts = Reference.objects.values_list('text', flat=True)
+        self.assertCountEqual(texts, ['DA', 'LM', '"ALR", 2'])
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql',
+                     'The correction in the database requires PostgreSQL.')
+class CorrectDiacriticsInDatabaseTests(TestCase):
+    """Tests correcting diacritics with SQL statements."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create an entry with diacritics with cedilla, and its annotation."""
+        cls.entry = Entry()
+        cls.entry.set_text('**ŞAŢ** text')
+        cls.entry.save()
+        cls.other_entry = Entry()
+        cls.other_entry.set_text('**ABA** text')
+        cls.other_entry.save()
+        cls.annotation = Annotation(entry=cls.entry,
+                                    user=User.objects.create_user('annotator'))
+        cls.annotation.set_text('**ŞAŢ** ţ')
+        cls.annotation.save()
+
+    def test_texts_and_metadata_are_corrected(self):
+        call_command('correctdiacritics',
+                     in_database=True,
+                     batch_size=1,
+                     stdout=StringIO())
+
+        entry = Entry.objects.get(id=self.entry.id)
+        self.assertEqual(entry.text, '**ȘAȚ** text')
+        self.assertEqual(entry.text_hash, compute_text_hash('**ȘAȚ** text'))
+        self.assertEqual(entry.title_word, 'ȘAȚ')
+        other_entry = Entry.objects.get(id=self.other_entry.id)
+        self.assertEqual(other_entry.text_hash, self.other_entry.text_hash)
+        annotation = Annotation.objects.get(id=self.annotation.id)
+        self.assertEqual(annotation.text, '**ȘAȚ** ț')
+        self.assertEqual(annotation.title_word, 'ȘAȚ')
+        self.assertEqual(annotation.version, self.annotation.version + 1)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql',
+                     'Selecting the exported annotations requires PostgreSQL.')
+class ExportEntriesTests(TestCase):
+    """Tests the incremental export of complete entries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create two entries with two complete annotations each."""
+        annotators = [User.objects.create_user(f'annotator{i}') for i in range(2)]
+        cls.entries, cls.annotations = [], []
+        for title_word in ['ABA', 'ABC']:
+            entry = Entry()
+            entry.set_text(f'**{title_word}** text')
+            entry.save()
+            cls.entries.append(entry)
+            for annotator in annotators:
+                annotation = Annotation(entry=entry,
+                                        user=annotator,
+                                        status='Complete')
+                annotation.set_text(f'**{title_word}** text')
+                annotation.save()
+                cls.annotations.append(annotation)
+
+    def setUp(self):
+        """Create the output directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.output_dir = Path(self.directory.name)
+
+    def export(self, **options):
+        """Export the entries with the specified options, and return the output."""
+        stdout = StringIO()
+        call_command('exportentries',
+                     output_dir=str(self.output_dir),
+                     stdout=stdout,
+                     **options)
+        return stdout.getvalue()
+
+    def get_file(self, entry):
+        """Get the path of the exported file of the entry."""
+        return self.output_dir / f'{entry.title_word_normalized}-{entry.id}.xml'
+
+    def test_incremental_export_is_tracked_per_target(self):
+        self.assertIn('Finished exporting 2 entries',
+                      self.export(incremental=True))
+        self.assertTrue(self.get_file(self.entries[0]).is_file())
+        self.assertIn('Finished exporting 2 entries',
+                      self.export(incremental=True, format='jsonl'))
+        self.assertEqual(ExportedEntry.objects.count(), 4)
+        self.assertIn('Finished exporting 0 entries',
+                      self.export(incremental=True))
+
+        annotation = self.annotations[0]
+        annotation.set_text('**ABA** new text')
+        annotation.save()
+        self.assertIn('Finished exporting 1 entries',
+                      self.export(incremental=True))
+
+    def test_deletions_are_exported_by_incremental_exports(self):
+        self.export(incremental=True)
+        Annotation.objects.filter(id=self.annotations[3].id)\
+                          .update(status='InProgress')
+
+        self.export()
+        self.assertTrue(self.get_file(self.entries[1]).is_file())
+        self.assertEqual(ExportedEntry.objects.count(), 2)
+
+        output = self.export(incremental=True)
+        self.assertIn('1 entries are no longer complete', output)
+        self.assertFalse(self.get_file(self.entries[1]).exists())
+        self.assertTrue(self.get_file(self.entries[0]).is_file())
+        self.assertEqual(
+            list(ExportedEntry.objects.values_list('entry_id', flat=True)),
+            [self.entries[0].id])
+
+
+class AnnotationExportTests(TestCase):
+    """Tests the admin actions which stream annotations."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create annotations on the pages of two volumes."""
+        dictionary = Dictionary.objects.create(name='DLR')
+        cls.annotator = User.objects.create_user('annotator')
+        cls.volumes = []
+        for volume_no, title_word in enumerate(['ABA', 'ABC'], start=1):
+            volume = Volume.objects.create(name=f'Vol. {volume_no}',
+                                           dictionary=dictionary)
+            page = Page.objects.create(volume=volume,
+                                       page_no=1,
+                                       image_path=f'data/{volume_no}/1.png')
+            entry = Entry()
+            entry.set_text(f'**{title_word}** text')
+            entry.save()
+            EntryPage.objects.create(entry=entry, page=page)
+            annotation = Annotation(entry=entry, user=cls.annotator)
+            annotation.set_text(f'**{title_word}** text, "quoted"')
+            annotation.save()
+            cls.volumes.append(volume)
+        cls.admin = User.objects.create_superuser('admin')
+
+    def export(self, action, **filters):
+        """Run the export action on all the annotations matching the filters."""
+        self.client.force_login(self.admin)
+        url = reverse('admin:annotation_annotation_changelist')
+        query = '&'.join(f'{key}={value}' for key, value in filters.items())
+        data = {'action': action, 'select_across': 1, 'index': 0,
+                '_selected_action': Annotation.objects.values_list('id', flat=True)}
+        response = self.client.post(f'{url}?{query}', data)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_export_csv_filtered_by_volume(self):
+        content = self.export('export_csv', volume=self.volumes[1].id)
+        lines = content.splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('id,entry_id,title_word,user'))
+        self.assertIn('ABC,annotator,InProgress', lines[1])
+        self.assertTrue(lines[1].endswith('"**ABC** text, ""quoted"""'))
+
+    def test_export_jsonl(self):
+        content = self.export('export_jsonl')
+        records = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([r['title_word'] for r in records], ['ABA', 'ABC'])
+        self.assertEqual(records[0]['user'], 'annotator')
+
+
+class ExportAnnotationsTests(TestCase):
+    """Tests the export of annotations to a Parquet file."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create two annotations of an entry on two pages."""
+        dictionary = Dictionary.objects.create(name='DLR')
+        volume = Volume.objects.create(name='Vol. I', dictionary=dictionary)
+        entry = Entry()
+        entry.set_text('**ABA** text')
+        entry.save()
+        for page_no in [2, 1]:
+            page = Page.objects.create(volume=volume,
+                                       page_no=page_no,
+                                       image_path=f'data/{page_no}.png')
+            EntryPage.objects.create(entry=entry, page=page)
+        annotator = User.objects.create_user('annotator')
+        for text, status in [('**ABA** text', 'Complete'),
+                             ('**ABĂ** text', 'InProgress')]:
+            annotation = Annotation(entry=entry, user=annotator, status=status)
+            annotation.set_text(text)
+            annotation.save()
+
+    def test_export_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output_file = Path(directory) / 'annotations.parquet'
+            call_command('exportannotations',
+                         batch_size=1,
+                         output_file=str(output_file),
+                         stdout=StringIO())
+            parquet_file = pq.ParquetFile(output_file)
+            self.assertEqual(parquet_file.metadata.num_row_groups, 2)
+            records = parquet_file.read().to_pylist()
+
+        self.assertEqual([r['title_word'] for r in records], ['ABA', 'ABĂ'])
+        self.assertEqual([r['status'] for r in records],
+                         ['Complete', 'InProgress'])
+        self.assertEqual(records[1]['title_word_normalized'], 'ABA')
+        self.assertEqual(records[0]['user'], 'annotator')
+        self.assertEqual(records[0]['dictionary'], 'DLR')
+        self.assertEqual(records[0]['volume'], 'Vol. I')
+        self.assertEqual(records[0]['page_numbers'], [1, 2])
+
+
+class ImportDataTests(TestCase):
+    """Tests importing entries, page images and mappings."""
+
+    def setUp(self):
+        """Create the directory of a volume with three pages and four entries."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        root = Path(self.directory.name)
+        self.entries_dir = root / 'data' / 'entries'
+        self.images_dir = root / 'data' / 'images'
+        self.entries_dir.mkdir(parents=True)
+        self.images_dir.mkdir(parents=True)
+        for page_no in range(1, 4):
+            header = struct.pack('>I4sII', 13, b'IHDR', 100 + page_no, 200)
+            path = self.images_dir / f'page-{page_no:03}.png'
+            path.write_bytes(PNG_SIGNATURE + header)
+        for title_word in ['ABA', 'ABC', 'ABD']:
+            path = self.entries_dir / f'{title_word}.xml'
+            path.write_text(
+                f'<entry><p><b>{title_word}</b>, <i>s.</i> text</p></entry>',
+                encoding='utf8')
+        (self.entries_dir / 'bad.xml').write_text(
+            '<entry><p>no title</p></entry>', encoding='utf8')
+        self.mappings_file = root / 'data' / 'mappings.csv'
+        self.mappings_file.write_text('ABA s.,"1,2"\nABC s.,"3,4"\n',
+                                      encoding='utf8')
+
+    def import_data(self, **options):
+        """Run the import with the specified options, and return its output."""
+        stdout = StringIO()
+        call_command('importdata',
+                     entries_directory=str(self.entries_dir),
+                     images_directory=str(self.images_dir),
+                     static_directory=self.directory.name,
+                     mappings_file=str(self.mappings_file),
+                     dictionary='DLR',
+                     volume='Vol. I',
+                     stdout=stdout,
+                     stderr=StringIO(),
+                     **options)
+        return stdout.getvalue()
+
+    def test_import_links_entries_to_pages(self):
+        self.import_data()
+
+        page = Page.objects.get(page_no=1)
+        self.assertEqual((page.width, page.height, page.byte_size),
+                         (101, 200, 24))
+        self.assertEqual(page.image_path, 'data/images/page-001.png')
+        entry_pages = EntryPage.objects.values_list('entry__title_word',
+                                                    'page__page_no')
+        self.assertCountEqual(entry_pages, [('ABA', 1), ('ABA', 2),
+                                            ('ABC', 3)])
+        statuses = ImportRecord.objects.values_list('file_path', 'status')
+        self.assertCountEqual(
+            [(Path(file_path).name, status) for file_path, status in statuses],
+            [('ABA.xml', 'Imported'), ('ABC.xml', 'Imported'),
+             ('ABD.xml', 'Unmapped'), ('bad.xml', 'Invalid')])
+
+        output = self.import_data()
+        self.assertIn('2 unchanged files were skipped', output)
+        self.assertEqual(Entry.objects.count(), 2)
+
+    def test_crlf_files_match_imported_entries(self):
+        entry_file = self.entries_dir / 'ABA.xml'
+        entry_file.write_bytes(
+            b'<entry>\n<p><b>ABA</b>, <i>s.</i> text</p>\n<p>more</p>\n</entry>')
+        self.import_data()
+        text = Entry.objects.get(title_word='ABA').text
+
+        entry_file.write_bytes(
+            b'<entry>\r\n<p><b>ABA</b>, <i>s.</i> text</p>\r\n<p>more</p>\r\n</entry>')
+        output = self.import_data()
+
+        self.assertIn('1 unchanged files were skipped', output)
+        self.assertEqual(Entry.objects.count(), 2)
+        entry = Entry.objects.get(title_word='ABA')
+        self.assertEqual(entry.text, text)
+        self.assertNotIn('\r', entry.text)
+
+    def test_dry_run_reports_problems(self):
+        output = self.import_data(dry_run=True)
+
+        self.assertIn('Found 4 entry files: 2 can be imported', output)
+        self.assertIn('Files without a title word: 1.', output)
+        self.assertIn('Entries without page mappings: 1.', output)
+        self.assertIn('Entries with missing page images: 1.', output)
+        self.assertIn('ABC: pages 4', output)
+        self.assertIn('Dry run: nothing was written.', output)
+        self.assertFalse(Volume.objects.exists())
+        self.assertFalse(Entry.objects.exists())
+
+
+class CorrectDiacriticsTests(TestCase):
+    """Tests the correction of diacritics in batches."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create entries with diacritics with cedilla."""
+        cls.entries = []
+        for text in ['**ŞA** text', '**AŢ** ţ', '**BA** text']:
+            entry = Entry()
+            entry.set_text(text)
+            entry.save()
+            cls.entries.append(entry)
+
+    def test_entries_are_corrected_after_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_file = Path(directory) / 'checkpoint.json'
+            checkpoint_file.write_text(
+                json.dumps({'annotation.Entry': self.entries[0].id}))
+            call_command('correctdiacritics',
+                         batch_size=1,
+                         checkpoint_file=str(checkpoint_file),
+                         stdout=StringIO())
+            self.assertFalse(checkpoint_file.exists())
+
+        texts = [entry.text for entry in Entry.objects.order_by('id')]
+        self.assertEqual(texts, ['**ŞA** text', '**AȚ** ț', '**BA** text'])
+        entry = Entry.objects.get(id=self.entries[1].id)
+        self.assertEqual(entry.title_word, 'AȚ')
+        self.assertEqual(entry.title_word_normalized, 'AT')
+
+    def test_duplicate_hash_is_cleared(self):
+        duplicate = Entry()
+        duplicate.set_text('**ȘA** text')
+        duplicate.save()
+        stdout = StringIO()
+        call_command('correctdiacritics', stdout=stdout)
+
+        entry = Entry.objects.get(id=self.entries[0].id)
+        self.assertEqual(entry.text, '**ȘA** text')
+        self.assertIsNone(entry.text_hash)
+        self.assertIn(f'Entry {entry.id} has the same text', stdout.getvalue())
+
+
+class UpdateMetadataTests(TestCase):
+    """Tests recomputing the metadata of entries and annotations."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create two entries and their annotations, one with stale metadata."""
+        annotator = User.objects.create_user('annotator')
+        cls.annotations = []
+        for text in ['**ABA** text', '**ABC** text']:
+            entry = Entry()
+            entry.set_text(text)
+            entry.save()
+            annotation = Annotation(entry=entry, user=annotator)
+            annotation.set_text(text)
+            annotation.save()
+            cls.annotations.append(annotation)
+        Entry.objects.filter(id=cls.annotations[1].entry_id)\
+                     .update(title_word='X', text_length=0)
+        Annotation.objects.filter(id=cls.annotations[1].id)\
+                          .update(title_word_normalized='X')
+
+    def test_only_stale_rows_are_written(self):
+        stdout = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('updatemetadata', workers=2, stdout=stdout)
+
+        updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ]
+        self.assertEqual(len(updates), 2)
+        self.assertTrue(updates[0].endswith(
+            f'IN ({self.annotations[1].entry_id})'))
+        self.assertTrue(updates[1].endswith(f'IN ({self.annotations[1].id})'))
+
+        output = stdout.getvalue()
+        self.assertIn('Updated the metadata of 1 of 2 entries', output)
+        self.assertIn('Updated the metadata of 1 of 2 annotations', output)
+        entry = Entry.objects.get(id=self.annotations[1].entry_id)
+        self.assertEqual((entry.title_word, entry.text_length), ('ABC', 12))
+        versions = Annotation.objects.order_by('id')\
+                                     .values_list('version', 'title_word_normalized')
+        self.assertEqual(list(versions), [(1, 'ABA'), (1, 'ABC')])
+
+
+class ShiftEntryPagesTests(TestCase):
+    """Tests shifting the pages of the entries of a volume."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create two entries on the three pages of a volume."""
+        dictionary = Dictionary.objects.create(name='DLR')
+        volume = Volume.objects.create(name='Vol. I', dictionary=dictionary)
+        cls.pages = {
+            page_no: Page.objects.create(volume=volume,
+                                         page_no=page_no,
+                                         image_path=f'data/{page_no}.png')
+            for page_no in range(1, 4)
+        }
+        cls.entries = []
+        for text, page_numbers in [('**ABA** text', [1, 2]),
+                                   ('**ABC** text', [2, 3])]:
+            entry = Entry()
+            entry.set_text(text)
+            entry.save()
+            for page_no in page_numbers:
+                EntryPage.objects.create(entry=entry, page=cls.pages[page_no])
+            cls.entries.append(entry)
+
+    def get_page_numbers(self, entry):
+        """Get the sorted numbers of the pages of the entry."""
+        return sorted(
+            EntryPage.objects.filter(entry=entry).values_list('page__page_no',
+                                                              flat=True))
+
+    def test_pages_are_shifted_and_collisions_removed(self):
+        call_command('shiftentrypages',
+                     dictionary='DLR',
+                     volume='Vol. I',
+                     page_offset=1,
+                     stdout=StringIO())
+
+        self.assertEqual(self.get_page_numbers(self.entries[0]), [2, 3])
+        self.assertEqual(self.get_page_numbers(self.entries[1]), [3])
+
+    def test_dry_run_does_not_change_pages(self):
+        stdout = StringIO()
+        call_command('shiftentrypages',
+                     dictionary='DLR',
+                     volume='Vol. I',
+                     page_offset=1,
+                     dry_run=True,
+                     stdout=stdout)
+
+        self.assertIn('Entry pages to shift: 2.', stdout.getvalue())
+        self.assertIn('already on the shifted page: 1.', stdout.getvalue())
+        self.assertEqual(self.get_page_numbers(self.entries[0]), [1, 2])
+
+
+class LoadMappingsTests(SimpleTestCase):
+    """Tests loading the mappings between entries and pages."""
+
+    def load(self, contents):
+        """Load the mappings from a file with the specified contents."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'mappings.csv'
+            path.write_text(contents, encoding='utf8')
+            return load_mappings(path)
+
+    def test_pages_are_merged_by_normalized_entry(self):
+        mappings = self.load('aba s.,"3,1"\nABA v.,"1,2"\nŞA,"5"\n')
+        self.assertEqual(mappings, {'ABA': [1, 2, 3], 'ȘA': [5]})
+
+    def test_blank_pages_are_ignored(self):
+        self.assertEqual(self.load('ABA,","\n,\n'), {})
+
+    def test_whitespace_pages_are_ignored(self):
+        mappings = self.load('ABA,"12, ,13, "\nABC," 4 "\n')
+        self.assertEqual(mappings, {'ABA': [12, 13], 'ABC': [4]})
+
+    def test_streamed_mappings_skip_empty_entries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'mappings.csv'
+            path.write_text('-AR s.,"1"\n² x,"2"\naba s.,"3, 1,"\n',
+                            encoding='utf8')
+            rows = list(iter_mappings(path))
+        self.assertEqual(rows, [('ABA', 3), ('ABA', 1)])
+
+
+class ImportReferencesTests(TestCase):
+    """Tests importing the references from a text file."""
+
+    def setUp(self):
+        """Create a references file with empty and duplicate lines."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.input_file = Path(self.directory.name) / 'references.txt'
+        self.input_file.write_text('DEX\n  LB  \n\nDEX\nCADE\n',
+                                   encoding='utf8')
+        Reference.objects.create(text='CADE', is_approved=False)
+
+    def import_references(self, input_file):
+        """Run the import with a batch size of one, and return its output."""
+        stdout = StringIO()
+        call_command('importreferences',
+                     input_file=str(input_file),
+                     batch_size=1,
+                     stdout=stdout)
+        return stdout.getvalue()
+
+    def test_distinct_references_are_inserted(self):
+        output = self.import_references(self.input_file)
+
+        self.assertIn('Inserted 2 references from 5 lines; 1 references already existed and 2 lines were empty or duplicates.',
+                      output)
+        references = Reference.objects.values_list('text', 'is_approved')
+        self.assertCountEqual(references, [('CADE', False), ('DEX', True),
+                                           ('LB', True)])
+
+    def test_rerun_does_not_duplicate_references(self):
+        self.import_references(self.input_file)
+        output = self.import_references(self.input_file)
+
+        self.assertIn('Inserted 0 references', output)
+        self.assertEqual(Reference.objects.count(), 3)
+
+    def test_missing_file_is_rejected(self):
+        with self.assertRaises(CommandError):
+            self.import_references(self.input_file.with_name('missing.txt'))
+        self.assertEqual(Reference.objects.count(), 1)
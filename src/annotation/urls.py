@@ -9,6 +9,9 @@ urlpatterns = [
     path("api/entries/<int:entry_id>",
          views.GetEntryContentsView.as_view(),
          name="get-entry"),
+    path("pages/<int:page_id>/image",
+         views.PageImageView.as_view(),
+         name="page-image"),
     path("complete",
          views.MarkAnnotationCompleteView.as_view(),
          name="mark-complete"),
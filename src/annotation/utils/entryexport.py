@@ -0,0 +1,304 @@
+"""Utility functions for serializing exported entries."""
+from pathlib import Path
+from xml.etree.ElementTree import Element
+from xml.etree.ElementTree import ElementTree
+from xml.etree.ElementTree import indent
+import hashlib
+import io
+import json
+import tarfile
+import time
+import zipfile
+
+EDTLR_NAMESPACE = 'https://edtlr.iit.academiaromana-is.ro'
+
+
+def build_entry(entry_id: int, title_word: str, title_word_normalized: str,
+                text: str) -> ElementTree:
+    """Build the element tree that represents the entry.
+
+    Parameters
+    ----------
+    entry_id: int, required
+        The id of the entry.
+    title_word: str, required
+        The title word.
+    title_word_normalized: str, required
+        The normalized form of the title word.
+    text: str, required
+        The text of the entry.
+
+    Returns
+    -------
+    entry: ElementTree
+        The element tree that represents the entry.
+    """
+    entry_elem = Element("entry", id=str(entry_id))
+    entry_elem.set('xmlns:edtlr', EDTLR_NAMESPACE)
+
+    tw_elem = Element("titleWord", md5hash=compute_md5_hash(title_word))
+    tw_elem.text = title_word
+    entry_elem.append(tw_elem)
+
+    twn_elem = Element('titleWordNormalized',
+                       md5hash=compute_md5_hash(title_word_normalized))
+    twn_elem.text = title_word_normalized
+    entry_elem.append(twn_elem)
+    body_elem = Element("body", md5hash=compute_md5_hash(text))
+    for line in text.splitlines():
+        paragraph_elem = Element("paragraph")
+        paragraph_elem.text = line
+        body_elem.append(paragraph_elem)
+    entry_elem.append(body_elem)
+
+    return ElementTree(entry_elem)
+
+
+def serialize_entry(entry: ElementTree, xml_declaration: bool = True) -> bytes:
+    """Serialize the indented entry to UTF-8 encoded XML.
+
+    Parameters
+    ----------
+    entry: ElementTree, required
+        The entry to serialize.
+    xml_declaration: bool, optional
+        Whether to start the document with an XML declaration.
+
+    Returns
+    -------
+    data: bytes
+        The serialized entry.
+    """
+    indent(entry.getroot())
+    buffer = io.BytesIO()
+    entry.write(buffer, xml_declaration=xml_declaration, encoding='UTF-8')
+    return buffer.getvalue()
+
+
+def get_entry_file_name(title_word: str, entry_id: int) -> str:
+    """Build the name of the file of the entry.
+
+    Parameters
+    ----------
+    title_word: str, required
+        The title word of the entry.
+    entry_id: int, required
+        The id of the entry.
+
+    Returns
+    -------
+    file_name: str
+        The name of the entry file.
+    """
+    return f'{title_word}-{entry_id}.xml'
+
+
+def compute_md5_hash(value: str | bytes) -> str:
+    """Compute the MD5 hash of the provided value.
+
+    Parameters
+    ----------
+    value: str or bytes, required
+        The value for which to compute the hash.
+
+    Returns
+    -------
+    hash_str: str
+        The hash string.
+    """
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return hashlib.md5(value).hexdigest()
+
+
+class EntryWriter:
+    """Writes exported entries into a single output file.
+
+    Every record is also listed, with its MD5 hash, in a manifest which is
+    written next to the output file in the format of `md5sum`.
+    """
+
+    extension = ''
+
+    def __init__(self, path: Path):
+        """Open the output file and its manifest.
+
+        Parameters
+        ----------
+        path: Path, required
+            The path of the output file.
+        """
+        self.path = path
+        self.manifest_path = path.with_name(f'{path.name}.md5')
+        self.manifest = open(self.manifest_path, 'w', encoding='utf8')
+        self.open()
+
+    def __enter__(self):
+        """Enter the runtime context of the writer."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the writer when leaving the runtime context."""
+        self.close()
+
+    def write(self, entry_id: int, title_word: str,
+              title_word_normalized: str, text: str) -> int:
+        """Write the entry to the output file.
+
+        Parameters
+        ----------
+        entry_id: int, required
+            The id of the entry.
+        title_word: str, required
+            The title word.
+        title_word_normalized: str, required
+            The normalized form of the title word.
+        text: str, required
+            The text of the entry.
+
+        Returns
+        -------
+        num_bytes: int
+            The size of the record before compression.
+        """
+        name = self.get_record_name(title_word_normalized, entry_id)
+        data = self.serialize(entry_id, title_word, title_word_normalized,
+                              text)
+        self.write_record(name, data)
+        self.manifest.write(f'{compute_md5_hash(data)}  {name}\n')
+        return len(data)
+
+    def get_record_name(self, title_word: str, entry_id: int) -> str:
+        """Get the name under which the entry is listed in the manifest."""
+        return get_entry_file_name(title_word, entry_id)
+
+    def serialize(self, entry_id: int, title_word: str,
+                  title_word_normalized: str, text: str) -> bytes:
+        """Serialize the entry as a single XML document."""
+        entry = build_entry(entry_id, title_word, title_word_normalized, text)
+        return serialize_entry(entry)
+
+    def open(self):
+        """Open the output file."""
+        raise NotImplementedError()
+
+    def write_record(self, name: str, data: bytes):
+        """Write the serialized entry with the specified name."""
+        raise NotImplementedError()
+
+    def close(self):
+        """Close the output file and the manifest."""
+        self.manifest.close()
+
+
+class TarEntryWriter(EntryWriter):
+    """Writes the entry files into a gzip-compressed tar archive."""
+
+    extension = 'tar.gz'
+
+    def open(self):
+        """Open the archive as a stream, which is never read back."""
+        self.archive = tarfile.open(str(self.path), 'w|gz')
+
+    def write_record(self, name: str, data: bytes):
+        """Add the entry file to the archive."""
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self.archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        """Close the archive and the manifest."""
+        self.archive.close()
+        super().close()
+
+
+class ZipEntryWriter(EntryWriter):
+    """Writes the entry files into a zip archive."""
+
+    extension = 'zip'
+
+    def open(self):
+        """Open the archive."""
+        self.archive = zipfile.ZipFile(self.path,
+                                       'w',
+                                       compression=zipfile.ZIP_DEFLATED)
+
+    def write_record(self, name: str, data: bytes):
+        """Add the entry file to the archive."""
+        self.archive.writestr(name, data)
+
+    def close(self):
+        """Close the archive and the manifest."""
+        self.archive.close()
+        super().close()
+
+
+class XmlEntryWriter(EntryWriter):
+    """Writes the entries as the children of the root of one XML document."""
+
+    extension = 'xml'
+
+    def open(self):
+        """Open the document and write its root element."""
+        self.file = open(self.path, 'wb')
+        self.file.write(b"<?xml version='1.0' encoding='UTF-8'?>\n")
+        self.file.write(f'<entries xmlns:edtlr="{EDTLR_NAMESPACE}">\n'.encode())
+
+    def serialize(self, entry_id: int, title_word: str,
+                  title_word_normalized: str, text: str) -> bytes:
+        """Serialize the entry as an XML element, without a declaration."""
+        entry = build_entry(entry_id, title_word, title_word_normalized, text)
+        return serialize_entry(entry, xml_declaration=False) + b'\n'
+
+    def write_record(self, name: str, data: bytes):
+        """Append the entry to the document."""
+        self.file.write(data)
+
+    def close(self):
+        """Close the root element, the document and the manifest."""
+        self.file.write(b'</entries>\n')
+        self.file.close()
+        super().close()
+
+
+class JsonlEntryWriter(EntryWriter):
+    """Writes each entry as a JSON object on its own line."""
+
+    extension = 'jsonl'
+
+    def open(self):
+        """Open the output file."""
+        self.file = open(self.path, 'wb')
+
+    def get_record_name(self, title_word: str, entry_id: int) -> str:
+        """Get the name of the entry, without the extension of XML files."""
+        return f'{title_word}-{entry_id}'
+
+    def serialize(self, entry_id: int, title_word: str,
+                  title_word_normalized: str, text: str) -> bytes:
+        """Serialize the entry as a line of JSON."""
+        record = {
+            'id': entry_id,
+            'titleWord': title_word,
+            'titleWordNormalized': title_word_normalized,
+            'text': text,
+            'md5hash': compute_md5_hash(text),
+        }
+        return json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+
+    def write_record(self, name: str, data: bytes):
+        """Append the line to the output file."""
+        self.file.write(data)
+
+    def close(self):
+        """Close the output file and the manifest."""
+        self.file.close()
+        super().close()
+
+
+ENTRY_WRITERS = {
+    writer.extension: writer
+    for writer in [TarEntryWriter, ZipEntryWriter, XmlEntryWriter,
+                   JsonlEntryWriter]
+}
@@ -0,0 +1,73 @@
+"""Utility functions for reading page images."""
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib
+import os
+import struct
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_HEADER_SIZE = 24
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class ImageInfo:
+    """Contains the properties of an image file."""
+
+    path: Path
+    byte_size: int
+    checksum: str
+    width: int | None = None
+    height: int | None = None
+
+
+def read_image_info(image_path: Path) -> ImageInfo:
+    """Read the size, checksum and pixel dimensions of the specified image.
+
+    The file is read once: the dimensions are parsed from the first chunk,
+    which is also the first chunk of the checksum. Both reading and hashing
+    release the GIL, so the function can be called from a pool of threads.
+
+    Parameters
+    ----------
+    image_path: Path, required
+        The path of the image.
+
+    Returns
+    -------
+    image_info: ImageInfo
+        The properties of the image.
+    """
+    hasher = hashlib.md5(usedforsecurity=False)
+    with open(image_path, 'rb') as f:
+        byte_size = os.fstat(f.fileno()).st_size
+        chunk = f.read(HASH_CHUNK_SIZE)
+        size = parse_png_size(chunk[:PNG_HEADER_SIZE])
+        while chunk:
+            hasher.update(chunk)
+            chunk = f.read(HASH_CHUNK_SIZE)
+    image_info = ImageInfo(image_path, byte_size, hasher.hexdigest())
+    if size is not None:
+        image_info.width, image_info.height = size
+    return image_info
+
+
+def parse_png_size(header: bytes) -> tuple[int, int] | None:
+    """Extract the pixel dimensions from the header of a PNG image.
+
+    Parameters
+    ----------
+    header: bytes, required
+        The first bytes of the image.
+
+    Returns
+    -------
+    (width, height): tuple of (int, int) or None
+        The dimensions of the image, or None if the header is not a valid PNG header.
+    """
+    if len(header) < PNG_HEADER_SIZE or not header.startswith(PNG_SIGNATURE):
+        return None
+    if header[12:16] != b'IHDR':
+        return None
+    width, height = struct.unpack('>II', header[16:24])
+    return (width, height)
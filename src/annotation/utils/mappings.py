@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+"""Utility functions for loading the mappings between entries and pages."""
+import argparse
+from functools import lru_cache
+from itertools import takewhile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+import csv
+import numpy as np
+import pandas as pd
+import time
+
+REPLACEMENT_MAP = str.maketrans("ŞşŢţÅåÁáẤấẮắ", "ȘșȚțAaAaAaAa")
+
+
+def normalize_entry(entry: str) -> str:
+    """Remove problematic characters from the given entry.
+
+    Parameters
+    ----------
+    entry: str, required
+        The entry to sanitize.
+
+    Returns
+    -------
+    canonical_entry: str
+        The normalized entry.
+    """
+    if entry is None:
+        return ""
+    entry = entry.strip()
+    if len(entry) == 0:
+        return ""
+
+    entry, *_ = entry.split()
+    entry = entry.upper()
+    entry = entry.translate(REPLACEMENT_MAP)
+    letters = [letter for letter in takewhile(lambda c: c.isalpha(), entry)]
+    canonical_entry = ''.join(letters)
+    return canonical_entry
+
+
+def read_mappings_file(mappings_file: Path) -> pd.DataFrame:
+    """Read the CSV file containing the mappings between entries and pages.
+
+    Parameters
+    ----------
+    mappings_file: Path, required
+        The path of the CSV file.
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        The data frame with the columns `entry` and `pages`.
+    """
+    return pd.read_csv(mappings_file,
+                       header=None,
+                       names=['entry', 'pages'],
+                       na_values='',
+                       keep_default_na=False,
+                       dtype=str)
+
+
+def load_mappings(mappings_file: Path) -> Dict[str, List[int]]:
+    """Load the entry-page mappings from the provided file.
+
+    The rows are grouped by their normalized entry, and the pages of each group
+    are merged. Only the distinct entry strings are normalized; splitting the
+    page lists and merging them is done on NumPy arrays.
+
+    Parameters
+    ----------
+    mappings_file: Path, required
+        The path of the CSV file from which to load the mappings.
+
+    Returns
+    -------
+    mappings: dict of (str, list of int)
+        The mappings as a dict with the normalized entry as the key, and the
+        sorted list of distinct page numbers as values.
+    """
+    df = read_mappings_file(mappings_file).dropna(subset=['pages'])
+    if df.empty:
+        return {}
+
+    row_codes, raw_entries = pd.factorize(df['entry'].fillna(''))
+    entry_codes, entries = pd.factorize(normalize_entries(raw_entries))
+    row_codes = entry_codes[row_codes]
+
+    page_lists = df['pages'].to_numpy(dtype=str)
+    counts = np.char.count(page_lists, ',') + 1
+    pages = np.char.strip(np.array(','.join(page_lists).split(','), dtype=str))
+    row_codes = np.repeat(row_codes, counts)
+    is_empty = pages == ''
+    pages = pages[~is_empty].astype(np.int64)
+    row_codes = row_codes[~is_empty]
+    if len(pages) == 0:
+        return {}
+
+    # Sorting the (entry, page) keys and removing duplicates leaves the pages
+    # of each entry in a contiguous, sorted run.
+    num_keys = pages.max() + 1
+    keys = np.sort(row_codes * num_keys + pages)
+    keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+    codes = keys // num_keys
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+    pages = (keys % num_keys).tolist()
+    return {
+        entries[code]: pages[start:end]
+        for code, start, end in zip(codes[starts].tolist(), starts.tolist(),
+                                    ends.tolist())
+    }
+
+
+def iter_mappings(mappings_file: Path) -> Iterator[tuple[str, int]]:
+    """Read the entry-page mappings from the provided file, one row at a time.
+
+    Unlike `load_mappings`, the file is not loaded into memory, and the pairs
+    are neither grouped nor deduplicated. The entries which normalize to an
+    empty string, such as suffixes, are skipped.
+
+    Parameters
+    ----------
+    mappings_file: Path, required
+        The path of the CSV file from which to read the mappings.
+
+    Returns
+    -------
+    mappings: generator of (str, int)
+        The normalized entry and the number of each mapped page.
+    """
+    normalize = lru_cache(maxsize=100_000)(normalize_entry)
+    with open(mappings_file, encoding='utf8', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 2:
+                continue
+            entry = normalize(row[0])
+            if not entry:
+                continue
+            for page in row[1].split(','):
+                if page.strip():
+                    yield (entry, int(page))
+
+
+def normalize_entries(entries: Iterable[str]) -> pd.Index:
+    """Apply `normalize_entry` to each of the specified entries.
+
+    The leading run of letters is extracted with a regular expression, which
+    also accepts some numeric characters, such as superscripts. The few entries
+    for which the result is not alphabetic are normalized one by one.
+
+    Parameters
+    ----------
+    entries: iterable of str, required
+        The entries to normalize.
+
+    Returns
+    -------
+    normalized: pandas.Index
+        The normalized entries, in the same order.
+    """
+    words = pd.Series(entries, dtype=object)\
+        .str.extract(r'^\s*(\S*)', expand=False)\
+        .str.upper()\
+        .str.translate(REPLACEMENT_MAP)\
+        .str.extract(r'^([^\W\d_]*)', expand=False)
+    mismatches = (words != '') & ~words.str.isalpha()
+    words[mismatches] = words[mismatches].map(normalize_entry)
+    return pd.Index(words)
+
+
+def load_mappings_iterative(mappings_file: Path) -> Dict[str, List[int]]:
+    """Load the entry-page mappings by iterating over the rows of the file.
+
+    This is the original implementation of `load_mappings`, and it is kept as
+    the baseline of the benchmark.
+
+    Parameters
+    ----------
+    mappings_file: Path, required
+        The path of the CSV file from which to load the mappings.
+
+    Returns
+    -------
+    mappings: dict of (str, list of int)
+        The mappings as a dict with the entry as the key, and the list of page numbers as values.
+    """
+    df = read_mappings_file(mappings_file).dropna(subset=['pages'])
+    result = {}
+    for row in df.itertuples():
+        pages = [int(num) for num in row.pages.split(',') if num.strip()]
+        entry = normalize_entry(row.entry)
+        if entry in result:
+            s1 = set(result[entry])
+            s2 = set(pages)
+            result[entry] = list(s1.union(s2))
+        else:
+            result[entry] = list(set(pages))
+
+    return result
+
+
+def benchmark(mappings_file: Path):
+    """Compare the vectorized and the iterative loading of the mappings.
+
+    Parameters
+    ----------
+    mappings_file: Path, required
+        The path of the CSV file containing the mappings.
+    """
+    results = {}
+    for name, load in [('iterative', load_mappings_iterative),
+                       ('vectorized', load_mappings)]:
+        start_time = time.perf_counter()
+        results[name] = load(mappings_file)
+        elapsed = time.perf_counter() - start_time
+        print(f'{name}: {len(results[name])} entries in {elapsed:.3f} seconds.')
+
+    expected = {k: sorted(v) for k, v in results['iterative'].items()}
+    if expected == results['vectorized']:
+        print('The mappings are identical.')
+    else:
+        print('The mappings differ.')
+
+
+def generate_mappings_file(mappings_file: Path, num_rows: int):
+    """Generate a random mappings file to be used by the benchmark.
+
+    Parameters
+    ----------
+    mappings_file: Path, required
+        The path of the CSV file to generate.
+    num_rows: int, required
+        The number of rows of the file.
+    """
+    rng = np.random.default_rng(0)
+    letters = np.array(list('ABCDEFGHIJKLMNOPRSTUVXZȘȚĂÎÂŞŢ'))
+    words = [
+        ''.join(rng.choice(letters, size=rng.integers(2, 10)))
+        for _ in range(num_rows // 2)
+    ]
+    first_pages = rng.integers(1, 2000, size=num_rows)
+    page_counts = rng.integers(1, 4, size=num_rows)
+    with open(mappings_file, 'w', encoding='utf8') as f:
+        for first_page, page_count in zip(first_pages, page_counts):
+            word = words[rng.integers(len(words))]
+            pages = ','.join(
+                str(first_page + i) for i in range(page_count))
+            f.write(f'{word} s.f.,"{pages}"\n')
+
+
+def main(args: argparse.Namespace):
+    """Do the logic."""
+    mappings_file = Path(args.mappings_file)
+    if args.generate_rows is not None:
+        generate_mappings_file(mappings_file, args.generate_rows)
+    benchmark(mappings_file)
+
+
+def parse_arguments():
+    """Parse the command-line arguments."""
+    parser = argparse.ArgumentParser(description='mappings')
+    parser.add_argument('--mappings-file',
+                        required=True,
+                        help="The path of the CSV file containing the mappings.")
+    parser.add_argument(
+        '--generate-rows',
+        type=int,
+        help="Generate a mappings file with the specified number of rows before running the benchmark.")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    main(parse_arguments())
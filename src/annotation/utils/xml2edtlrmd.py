@@ -1,9 +1,13 @@
 #!/usr/bin/env python
 import argparse
 from pathlib import Path
+from typing import Iterable, Iterator
+import itertools
 import re
+import time
 
 CEDILLA_DIACRITICS_MAP = str.maketrans("ŞşŢţ", "ȘșȚț")
+CHUNK_SIZE = 1024 * 1024
 
 
 class Marks:
@@ -17,6 +21,27 @@ class Marks:
     SPACED = '$'
 
 
+CEDILLA_DIACRITICS = [(chr(src), chr(dst))
+                      for src, dst in CEDILLA_DIACRITICS_MAP.items()]
+TAG_MARKS = {
+    'entry': '',
+    'p': '\n',
+    'b': Marks.BOLD,
+    'i': Marks.EMPHASIS,
+    'sup': Marks.SUPERSCRIPT,
+    'sg': Marks.REFERENCE,
+}
+# Maps every tag matched by TAG_PATTERN to its replacement.
+TAG_REPLACEMENTS = {
+    **{f'<{tag}>': mark
+       for tag, mark in TAG_MARKS.items()},
+    **{f'</{tag}>': mark
+       for tag, mark in TAG_MARKS.items()},
+}
+TAG_PATTERN = re.compile(f'</?(?:{"|".join(TAG_MARKS)})>')
+MAX_TAG_LENGTH = max(len(tag) for tag in TAG_REPLACEMENTS)
+
+
 def correct_diacritics(text: str) -> str:
     """Replace diacritics with cedilla to diacritics with comma below in te input text.
 
@@ -30,7 +55,11 @@ def correct_diacritics(text: str) -> str:
     corrected_text: str
         The text with proper diacritics.
     """
-    return text.translate(CEDILLA_DIACRITICS_MAP)
+    # Replacing each character is much faster than `str.translate`, which
+    # looks up every character of the text in the translation table.
+    for cedilla, comma_below in CEDILLA_DIACRITICS:
+        text = text.replace(cedilla, comma_below)
+    return text
 
 
 def remove_annotation_marks(text: str) -> str:
@@ -57,6 +86,110 @@ def remove_annotation_marks(text: str) -> str:
 def convert_xml_to_edtlr_markdown(xml_string: str) -> str:
     """Conver the provided XML string to eDTLR markdown.
 
+    All the tags are replaced in a single pass over the string.
+
+    Parameters
+    ----------
+    xml_string: str, required
+        The XML string to convert.
+
+    Returns
+    -------
+    markdown_string: str
+        The input string converted to eDTLR markdown.
+    """
+    return correct_diacritics(TAG_PATTERN.sub(_replace_tag,
+                                              xml_string)).strip()
+
+
+def convert_xml_stream(chunks: Iterable[str]) -> Iterator[str]:
+    """Convert the XML string given as a sequence of chunks to eDTLR markdown.
+
+    The output is the same as the output of `convert_xml_to_edtlr_markdown`
+    for the concatenated chunks, but only one chunk is kept in memory at a time.
+
+    Parameters
+    ----------
+    chunks: iterable of str, required
+        The consecutive chunks of the XML string.
+
+    Returns
+    -------
+    markdown_chunks: generator of str
+        The consecutive chunks of the eDTLR markdown string.
+    """
+    tail, whitespace, started = '', '', False
+    for chunk in itertools.chain(chunks, [None]):
+        if chunk is None:
+            data, tail = tail, ''
+        else:
+            # Keep a tag which is split between chunks for the next chunk.
+            data = tail + chunk
+            start = data.rfind('<', max(0, len(data) - MAX_TAG_LENGTH + 1))
+            if start != -1 and '>' not in data[start:]:
+                data, tail = data[:start], data[start:]
+            else:
+                tail = ''
+
+        text = correct_diacritics(TAG_PATTERN.sub(_replace_tag, data))
+        if not started:
+            text = text.lstrip()
+            started = len(text) > 0
+        # Trailing whitespace is written only if some text follows it.
+        stripped = text.rstrip()
+        if stripped:
+            yield whitespace + stripped
+            whitespace = text[len(stripped):]
+        else:
+            whitespace += text
+
+
+def convert_xml_file(input_file: Path, output_file: Path):
+    """Convert the specified XML file to eDTLR markdown, one chunk at a time.
+
+    Parameters
+    ----------
+    input_file: Path, required
+        The path of the input XML file.
+    output_file: Path, required
+        The path of the output file.
+    """
+    with open(input_file, encoding='utf8') as fin, \
+         open(output_file, mode='w', encoding='utf8') as fout:
+        chunks = iter(lambda: fin.read(CHUNK_SIZE), '')
+        for markdown_chunk in convert_xml_stream(chunks):
+            fout.write(markdown_chunk)
+
+
+def convert_xml_directory(input_dir: Path, output_dir: Path) -> int:
+    """Convert all XML files from the input directory to eDTLR markdown.
+
+    Parameters
+    ----------
+    input_dir: Path, required
+        The path of the directory containing the XML files.
+    output_dir: Path, required
+        The path of the directory where to write the markdown files.
+
+    Returns
+    -------
+    num_files: int
+        The number of converted files.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    num_files = 0
+    for input_file in sorted(input_dir.glob('*.xml')):
+        convert_xml_file(input_file, output_dir / f'{input_file.stem}.md')
+        num_files += 1
+    return num_files
+
+
+def convert_xml_to_edtlr_markdown_multipass(xml_string: str) -> str:
+    """Convert the XML string to eDTLR markdown with one pass per tag.
+
+    This is the original implementation of the conversion, kept as the
+    baseline against which `benchmark` checks the output and the throughput.
+
     Parameters
     ----------
     xml_string: str, required
@@ -74,37 +207,94 @@ def convert_xml_to_edtlr_markdown(xml_string: str) -> str:
     data = re.sub(r"<\/?i>", Marks.EMPHASIS, data)
     data = re.sub(r"<\/?sup>", Marks.SUPERSCRIPT, data)
     data = re.sub(r"<\/?sg>", Marks.REFERENCE, data)
-    return correct_diacritics(data.strip())
+    return data.strip().translate(CEDILLA_DIACRITICS_MAP)
 
 
-def main(input_file: Path, output_file: Path = None):
-    """Do the logic."""
-    if output_file is None:
-        output_file = Path(f'{input_file.stem}.md')
+def benchmark(input_dir: Path):
+    """Compare the single-pass and the multi-pass conversions of the XML files.
+
+    Parameters
+    ----------
+    input_dir: Path, required
+        The path of the directory containing the XML files.
+    """
+    documents = []
+    for input_file in sorted(input_dir.glob('*.xml')):
+        with open(input_file, encoding='utf8') as f:
+            documents.append((input_file, f.read()))
+    num_bytes = sum(len(doc.encode('utf8')) for _, doc in documents)
 
-    with open(input_file, encoding='utf8') as f:
-        input_string = f.read()
+    results = {}
+    for name, convert in [('multi-pass', convert_xml_to_edtlr_markdown_multipass),
+                          ('single-pass', convert_xml_to_edtlr_markdown),
+                          ('streaming', lambda doc: ''.join(
+                              convert_xml_stream([doc])))]:
+        start_time = time.perf_counter()
+        results[name] = [convert(doc) for _, doc in documents]
+        elapsed = time.perf_counter() - start_time
+        throughput = num_bytes / elapsed / (1024 * 1024) if elapsed > 0 else 0
+        print(f'{name}: {len(documents)} files in {elapsed:.3f} seconds ({throughput:.1f} MB/s).')
+
+    reference = results.pop('multi-pass')
+    for name, outputs in results.items():
+        mismatches = [
+            input_file
+            for (input_file, _), expected, actual in zip(documents, reference, outputs)
+            if expected.encode('utf8') != actual.encode('utf8')
+        ]
+        print(f'{name}: {len(mismatches)} files differ from the multi-pass output.')
+        for input_file in mismatches:
+            print(f'  {input_file}')
+
+
+def _replace_tag(match: re.Match) -> str:
+    """Get the replacement of the tag matched by TAG_PATTERN."""
+    return TAG_REPLACEMENTS[match[0]]
+
+
+def main(args: argparse.Namespace):
+    """Do the logic."""
+    if args.benchmark:
+        benchmark(Path(args.input_directory))
+        return
 
-    input_string = convert_xml_to_edtlr_markdown(input_string)
+    if args.input_directory is not None:
+        output_dir = Path(args.output_directory or args.input_directory)
+        num_files = convert_xml_directory(Path(args.input_directory),
+                                          output_dir)
+        print(f'Converted {num_files} files.')
+        return
 
-    with open(output_file, mode="w", encoding='utf8') as f:
-        f.write(input_string)
+    input_file = Path(args.input_file)
+    output_file = Path(args.output_file or f'{input_file.stem}.md')
+    convert_xml_file(input_file, output_file)
 
 
 def parse_arguments():
     """Parse the command-line arguments."""
     parser = argparse.ArgumentParser(description='xml2edtlrmd')
-    parser.add_argument('--input-file',
-                        required=True,
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument('--input-file',
                         help="The path of the input XML file.")
+    inputs.add_argument('--input-directory',
+                        help="The path of the directory containing XML files.")
     parser.add_argument('--output-file',
                         required=False,
                         help="The path of the output file.")
+    parser.add_argument(
+        '--output-directory',
+        required=False,
+        help="The path of the directory where to write the converted files.")
+    parser.add_argument(
+        '--benchmark',
+        action='store_true',
+        help="Compare the conversion methods on the files from the input directory.")
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.benchmark and args.input_directory is None:
+        parser.error('--benchmark requires --input-directory.')
+    return args
 
 
 if __name__ == '__main__':
-    args = parse_arguments()
-    main(Path(args.input_file),
-         Path(args.output_file) if args.output_file is not None else None)
+    main(parse_arguments())
@@ -4,5 +4,6 @@ from .getentrycontents import GetEntryContentsView
 from .index import IndexView
 from .markcomplete import MarkAnnotationCompleteView
 from .newannotation import NewAnnotationView
+from .pageimage import PageImageView
 from .saveannotation import SaveAnnotationView
 from .thankyou import ThankYouView
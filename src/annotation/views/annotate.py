@@ -1,8 +1,10 @@
 """The view for annotating an entry."""
 from annotation.models.annotation import Annotation
 from annotation.models.entry import Entry
-from annotation.models.entrypage import EntryPage
-from annotation.views.utils import get_image_path
+from annotation.views.utils import get_entry_pages
+from annotation.views.utils import get_next_entry
+from annotation.views.utils import get_page_images
+from annotation.views.viewsettings import PREFETCH_PAGES_SESSION_KEY
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import redirect, render
 from django.views import View
@@ -31,15 +33,23 @@ class AnnotateView(LoginRequiredMixin, View):
             return render(request,
                           self.template_name,
                           context=self.__build_template_context(
-                              current_annotation.entry))
+                              request, current_annotation.entry))
         else:
             return redirect(self.index_page)
 
-    def __build_template_context(self, entry: Entry) -> dict:
-        entry_pages = EntryPage.objects.filter(entry=entry)
-        pages = sorted([e.page for e in entry_pages], key=lambda p: p.page_no)
-        page_images = [get_image_path(p) for p in pages]
-        return {'entry_id': entry.id, 'page_images': page_images}
+    def __build_template_context(self, request, entry: Entry) -> dict:
+        page_images = get_page_images(get_entry_pages(entry))
+        # The entry that the user will most likely get after completing the
+        # current one; its images are prefetched while the user annotates.
+        next_entry = get_next_entry(request.user)
+        next_pages = get_entry_pages(next_entry)
+        request.session[PREFETCH_PAGES_SESSION_KEY] = [p.id for p in next_pages]
+        next_page_images = get_page_images(next_pages)
+        return {
+            'entry_id': entry.id,
+            'page_images': page_images,
+            'next_page_images': next_page_images
+        }
 
     def __get_in_progress_annotation(self, user_id: int,
                                      annotation_id: int) -> Annotation | None:
@@ -0,0 +1,102 @@
+"""Streams annotations as CSV or JSON Lines responses."""
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from typing import Iterator
+import csv
+import json
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('entry_id', 'entry_id'),
+    ('title_word', 'title_word'),
+    ('user', 'user__username'),
+    ('status', 'status'),
+    ('version', 'version'),
+    ('text_length', 'text_length'),
+    ('row_creation_timestamp', 'row_creation_timestamp'),
+    ('row_update_timestamp', 'row_update_timestamp'),
+    ('text', 'text'),
+]
+
+
+class Echo:
+    """Implements the write method of a file by returning the written value."""
+
+    def write(self, value: str) -> str:
+        """Return the value instead of writing it."""
+        return value
+
+
+def stream_annotations(queryset: QuerySet,
+                       export_format: str) -> StreamingHttpResponse:
+    """Build the response which streams the annotations of the queryset.
+
+    The rows are read from the database in chunks, with a server-side cursor,
+    and each row is sent as soon as it is formatted.
+
+    Parameters
+    ----------
+    queryset: QuerySet, required
+        The annotations to export.
+    export_format: str, required
+        The format of the rows; one of 'csv' and 'jsonl'.
+
+    Returns
+    -------
+    response: StreamingHttpResponse
+        The response containing the rows.
+    """
+    rows = queryset\
+        .values_list(*[field for _, field in EXPORT_COLUMNS])\
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if export_format == 'csv':
+        content, content_type = iter_csv(rows), 'text/csv; charset=utf-8'
+    else:
+        content, content_type = iter_jsonl(rows), 'application/jsonl; charset=utf-8'
+
+    timestamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = \
+        f'attachment; filename="annotations-{timestamp}.{export_format}"'
+    return response
+
+
+def iter_csv(rows: Iterator[tuple]) -> Iterator[str]:
+    """Format the rows as CSV lines, preceded by the header.
+
+    Parameters
+    ----------
+    rows: iterator of tuple, required
+        The values of `EXPORT_COLUMNS` for each annotation.
+
+    Returns
+    -------
+    lines: generator of str
+        The lines of the CSV document.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_jsonl(rows: Iterator[tuple]) -> Iterator[str]:
+    """Format the rows as JSON objects, one on each line.
+
+    Parameters
+    ----------
+    rows: iterator of tuple, required
+        The values of `EXPORT_COLUMNS` for each annotation.
+
+    Returns
+    -------
+    lines: generator of str
+        The lines of the JSON Lines document.
+    """
+    names = [name for name, _ in EXPORT_COLUMNS]
+    for row in rows:
+        record = dict(zip(names, row))
+        yield json.dumps(record, ensure_ascii=False, cls=DjangoJSONEncoder) + '\n'
@@ -1,20 +1,18 @@
 """The view for a new annotation."""
 from annotation.models.annotation import Annotation
 from annotation.models.entry import Entry
-from annotation.models.page import Page
 from annotation.models.reference import Reference
 from annotation.utils.automaticannotation import ReferenceAnnotator
 from annotation.utils.automaticannotation import apply_preprocessing
 from annotation.utils.xml2edtlrmd import remove_annotation_marks
+from annotation.views.utils import get_next_entry
 from annotation.views.viewsettings import APPLICATION_MODE
 from annotation.views.viewsettings import AUTOMATIC_REFERENCE_ANNOTATION
 from annotation.views.viewsettings import ApplicationModes
-from annotation.views.viewsettings import MAX_CONCURRENT_ANNOTATORS
 from annotation.views.viewsettings import PRESERVE_ENTRY_TEXT
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
 from django.core.cache import cache
-from django.db.models import Count
 from django.shortcuts import redirect
 from django.views import View
 import random
@@ -50,34 +48,13 @@ class NewAnnotationView(LoginRequiredMixin, View):
         request: HttpRequest, required
             The request object.
         """
-        entry = self.__get_next_entry(request.user)
+        entry = get_next_entry(request.user)
         if entry is not None:
             annotation = self.__insert_annotation(request.user, entry)
             return redirect(self.annotate_page, id=annotation.id)
 
         return redirect(self.thank_you_page)
 
-    def __get_next_entry(self, user: User) -> Page | None:
-        """Get next entry to annotate.
-
-        Parameters
-        ----------
-        user: User, required
-            The request user.
-
-        Returns
-        -------
-        entry: Entry
-            The next entry to annotate.
-        """
-        entries_from_active_dictionary = Entry.objects.filter(entrypage__page__volume__dictionary__is_active=True)
-        next_entries = entries_from_active_dictionary.exclude(annotation__user=user)\
-                                                     .annotate(annotation_count=Count('annotation', distinct=True))\
-                                                     .filter(annotation_count__lt=MAX_CONCURRENT_ANNOTATORS)\
-                                                     .distinct()
-        next_entry = next_entries.order_by('-annotation_count', 'id').first()
-        return next_entry
-
     def __insert_annotation(self, user: User, entry: Entry) -> Annotation:
         """Create a new annotation for the specified entry and user.
 
@@ -0,0 +1,107 @@
+"""The view for serving page images."""
+from annotation.apps import AnnotationConfig
+from annotation.models.annotation import Annotation
+from annotation.models.page import Page
+from annotation.views.utils import IMAGE_VERSION_LENGTH
+from annotation.views.viewsettings import PAGE_IMAGES_INTERNAL_URL
+from annotation.views.viewsettings import PREFETCH_PAGES_SESSION_KEY
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.staticfiles import finders
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views import View
+import mimetypes
+
+
+class PageImageView(LoginRequiredMixin, View):
+    """Implements the view that serves the image of a page.
+
+    The view only checks that the user may see the page; the file itself is
+    streamed by NginX through the internal location named in the
+    `X-Accel-Redirect` header.
+    """
+
+    def get(self, request, page_id: int) -> HttpResponse:
+        """Handle the GET request.
+
+        Parameters
+        ----------
+        request: HttpRequest, required
+            The request object.
+        page_id: int, required
+            The id of the page whose image to serve.
+
+        Returns
+        -------
+        response: HttpResponse
+            An empty response which redirects NginX to the image file.
+        """
+        page = Page.objects.filter(pk=page_id).first()
+        if page is None:
+            raise Http404()
+        if not self.__can_view(request, page):
+            raise PermissionDenied()
+
+        content_type, _ = mimetypes.guess_type(page.image_path)
+        if settings.DEBUG:
+            response = self.__serve_file(page, content_type)
+        else:
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = f'{PAGE_IMAGES_INTERNAL_URL}{page.image_path}'
+
+        version = request.GET.get('v')
+        if version and version == page.image_hash[:IMAGE_VERSION_LENGTH]:
+            patch_cache_control(response,
+                                private=True,
+                                max_age=31536000,
+                                immutable=True)
+        else:
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def __can_view(self, request, page: Page) -> bool:
+        """Check whether the user has an annotation on an entry from the page.
+
+        The pages of the entry predicted to be annotated next by the user are
+        also allowed, so that they can be prefetched.
+
+        Parameters
+        ----------
+        request: HttpRequest, required
+            The request object.
+        page: Page, required
+            The requested page.
+
+        Returns
+        -------
+        can_view: bool
+            True if the user may see the page; False otherwise.
+        """
+        if page.id in request.session.get(PREFETCH_PAGES_SESSION_KEY, []):
+            return True
+        return Annotation.objects.filter(user=request.user,
+                                         entry__entrypage__page=page)\
+                                 .exists()
+
+    def __serve_file(self, page: Page,
+                     content_type: str | None) -> FileResponse:
+        """Serve the image file directly, when running without NginX.
+
+        Parameters
+        ----------
+        page: Page, required
+            The page whose image to serve.
+        content_type: str, required
+            The content type of the image.
+
+        Returns
+        -------
+        response: FileResponse
+            The response which streams the image file.
+        """
+        file_path = finders.find(f'{AnnotationConfig.name}/{page.image_path}')
+        if file_path is None:
+            raise Http404()
+        return FileResponse(open(file_path, 'rb'), content_type=content_type)
@@ -1,21 +1,103 @@
 """Defines utility methods for views."""
+from annotation.models.entry import Entry
+from annotation.models.entrypage import EntryPage
 from annotation.models.page import Page
-from annotation.apps import AnnotationConfig
+from annotation.views.viewsettings import MAX_CONCURRENT_ANNOTATORS
+from dataclasses import dataclass
+from django.contrib.auth.models import User
+from django.db.models import Count
+from django.urls import reverse
 
+IMAGE_VERSION_LENGTH = 12
 
-def get_image_path(page: Page | None) -> str:
-    """Get the image path of the specified page.
+
+@dataclass
+class PageImage:
+    """Contains the data needed for displaying a page image."""
+
+    url: str
+    width: int | None
+    height: int | None
+
+
+def get_image_url(page: Page | None) -> str | None:
+    """Get the URL of the image of the specified page.
+
+    The URL points to the view which checks access to the image, and contains
+    a version parameter derived from the hash of the image, so that browsers
+    can cache it indefinitely and still get the new image after a re-import.
 
     Parameters
     ----------
     page: Page, required
-        The page for which to get the image path.
+        The page for which to get the image URL.
 
     Returns
     -------
-    image_path: str or None
-        The image path of the image, or None if the page is None.
+    image_url: str or None
+        The URL of the image, or None if the page is None.
     """
     if page is None:
         return None
-    return f'/{AnnotationConfig.name}/{page.image_path}'
+    url = reverse('annotation:page-image', args=[page.id])
+    if page.image_hash:
+        url = f'{url}?v={page.image_hash[:IMAGE_VERSION_LENGTH]}'
+    return url
+
+
+def get_page_images(pages: list[Page]) -> list[PageImage]:
+    """Get the display data of the images of the specified pages.
+
+    Parameters
+    ----------
+    pages: list of Page, required
+        The pages for which to get the image data.
+
+    Returns
+    -------
+    page_images: list of PageImage
+        The URL and pixel dimensions of each page image.
+    """
+    return [PageImage(get_image_url(p), p.width, p.height) for p in pages]
+
+
+def get_entry_pages(entry: Entry | None) -> list[Page]:
+    """Get the pages of the specified entry, ordered by page number.
+
+    Parameters
+    ----------
+    entry: Entry, required
+        The entry for which to load the pages.
+
+    Returns
+    -------
+    pages: list of Page
+        The pages of the entry, or an empty list if the entry is None.
+    """
+    if entry is None:
+        return []
+    entry_pages = EntryPage.objects.filter(entry=entry)\
+                                   .select_related('page')
+    return sorted([e.page for e in entry_pages], key=lambda p: p.page_no)
+
+
+def get_next_entry(user: User) -> Entry | None:
+    """Get next entry to annotate.
+
+    Parameters
+    ----------
+    user: User, required
+        The request user.
+
+    Returns
+    -------
+    entry: Entry
+        The next entry to annotate.
+    """
+    entries_from_active_dictionary = Entry.objects.filter(entrypage__page__volume__dictionary__is_active=True)
+    next_entries = entries_from_active_dictionary.exclude(annotation__user=user)\
+                                                 .annotate(annotation_count=Count('annotation', distinct=True))\
+                                                 .filter(annotation_count__lt=MAX_CONCURRENT_ANNOTATORS)\
+                                                 .distinct()
+    next_entry = next_entries.order_by('-annotation_count', 'id').first()
+    return next_entry
@@ -5,6 +5,8 @@ from enum import Enum
 MAX_CONCURRENT_ANNOTATORS = int(getattr(settings, "MAX_CONCURRENT_ANNOTATORS", 2))
 AUTOMATIC_REFERENCE_ANNOTATION = getattr(settings, 'AUTOMATIC_REFERENCE_ANNOTATION', False)
 PRESERVE_ENTRY_TEXT = getattr(settings, 'PRESERVE_ENTRY_TEXT', True)
+PAGE_IMAGES_INTERNAL_URL = getattr(settings, 'PAGE_IMAGES_INTERNAL_URL', '/annotate/page-images/')
+PREFETCH_PAGES_SESSION_KEY = 'prefetch_page_ids'
 
 
 class ApplicationModes(Enum):
@@ -153,6 +153,17 @@ USE_TZ = True
 STATIC_URL = env('STATIC_URL', default='static').rstrip('/') + '/'
 STATIC_ROOT = env('STATIC_ROOT')
 
+# Static assets are collected under content-hashed names, so that they can be
+# cached indefinitely by browsers and NginX.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'annotation.storage.HashedStaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 